@@ -1,12 +1,41 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import Response, StreamingResponse
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from contextlib import asynccontextmanager
 from .github_client import GitHubClient
 from .ranking import DeveloperRanker
-import json
+from .xai_client import start_http_client, close_http_client
+from .scheduler import get_llm_scheduler
+from .cache import get_rating_cache
+from .query_parser import get_query_parser
+from .coalescing import SearchCoalescer
+from .models import Developer, JobRequest
+from .jobs import JobManager
+from .candidate_index import IndexRefresher
+from .telemetry import get_loop_lag_monitor, span
+from .compute import dump_developers, dumps, run_in_thread, shutdown_executors
 import asyncio
+from typing import Optional
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await start_http_client()
+    await github_client.connect()
+    get_loop_lag_monitor().start()
+    await jobs.start()
+    if index_refresher is not None:
+        index_refresher.start()
+    yield
+    if index_refresher is not None:
+        await index_refresher.stop()
+    await jobs.stop()
+    await get_loop_lag_monitor().stop()
+    await github_client.close()
+    await close_http_client()
+    shutdown_executors()
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -18,38 +47,119 @@ app.add_middleware(
 
 github_client = GitHubClient()
 ranker = DeveloperRanker()
+jobs = JobManager.from_env(github_client, ranker)
+index_refresher = IndexRefresher.from_env(github_client.index, github_client) if github_client.index is not None else None
 
-@app.get("/search/{query}")
-async def search_cracked_devs(query: str, limit: int = 10):
-    developers = await github_client.find_cracked_developers(query, limit=limit)
-    ranked_developers = await ranker.rank_developers(developers, query)
-    return ranked_developers
+@app.get("/stats")
+async def stats():
+    return {
+        "llm_scheduler": get_llm_scheduler().stats(),
+        "rating_cache": get_rating_cache().stats(),
+        "query_parser": get_query_parser().stats(),
+        "searches": searches.stats(),
+        "cascade": ranker.cascade_stats(),
+        "event_loop": get_loop_lag_monitor().stats(),
+        "jobs": await jobs.stats(),
+        "github": github_client.stats(),
+        "candidate_index": {"profiles": await run_in_thread(len, github_client.index)} if github_client.index is not None else None,
+    }
 
-@app.get("/search-stream/{query}")
-async def search_cracked_devs_stream(query: str, limit: int = 10):
-    async def event_generator():
+@app.get("/metrics")
+async def metrics():
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+def sse(event: dict) -> str:
+    return f"data: {dumps(event).decode()}\n\n"
+
+def done_event(developers: list[Developer]) -> str:
+    return f"data: {{\"type\":\"done\",\"results\":{dump_developers(developers).decode()}}}\n\n"
+
+async def run_search(query: str, limit: int, top_k: Optional[int], publish) -> list[Developer]:
+    """
+    The search pipeline behind both endpoints. Progress is published as SSE
+    events so every streaming subscriber of a coalesced run sees the same stream.
+    Without top_k, each page's Grok ratings start as soon as the page arrives,
+    overlapping later page fetches. With top_k, all pages are collected first
+    so candidates that can't reach the top K are never sent to Grok (see
+    DeveloperRanker.iter_rated_developers).
+    """
+    with span("search_pipeline", limit=limit):
         # Step 1: Parse query
-        yield f"data: {json.dumps({'type': 'status', 'message': 'parsing your query with grok...'})}\n\n"
+        publish(sse({'type': 'status', 'message': 'parsing your query with grok...'}))
 
-        # Step 2: Search GitHub
-        yield f"data: {json.dumps({'type': 'status', 'message': 'searching github for developers...'})}\n\n"
-        developers = await github_client.find_cracked_developers(query, limit=limit)
+        # Step 2: Search GitHub, rating each page as it lands unless the cascade needs the whole set
+        publish(sse({'type': 'status', 'message': 'searching github for developers...'}))
+        developers = []
+        cached = {}
+        in_flight = {}
+        pages = github_client.iter_candidate_pages(query, limit=limit)
+        try:
+            async for page in pages:
+                if top_k is None:
+                    page_cached, page_in_flight = await ranker.start_rating(page, query, offset=len(developers))
+                    cached.update(page_cached)
+                    in_flight.update(page_in_flight)
+                developers.extend(page)
+                publish(sse({'type': 'status', 'message': f'found {len(developers)} candidates, analyzing with grok...'}))
+        except BaseException:
+            for task in in_flight:
+                task.cancel()
+            raise
+        finally:
+            await pages.aclose()
 
         if not developers:
-            yield f"data: {json.dumps({'type': 'status', 'message': 'no developers found'})}\n\n"
-            yield f"data: {json.dumps({'type': 'done', 'results': []})}\n\n"
-            return
+            publish(sse({'type': 'status', 'message': 'no developers found'}))
+            publish(sse({'type': 'done', 'results': []}))
+            return []
+
+        # Step 3: Publish each developer as soon as its rating lands, with its provisional rank.
+        # Cancelling the run (last subscriber gone) closes the iterator, cancelling pending Grok calls.
+        ranked_developers = []
+        rated = ranker.iter_rated_developers(developers, query, top_k=top_k, cached=cached, in_flight=in_flight)
+        try:
+            async for dev, rank, rated_count in rated:
+                ranked_developers.insert(rank, dev)
+                publish(sse({'type': 'result', 'developer': dev.model_dump(), 'rank': rank, 'rated': rated_count, 'total': len(developers)}))
+        finally:
+            await rated.aclose()
 
-        yield f"data: {json.dumps({'type': 'status', 'message': f'found {len(developers)} candidates, analyzing with grok...'})}\n\n"
+        if len(ranked_developers) < len(developers):
+            skipped = len(developers) - len(ranked_developers)
+            publish(sse({'type': 'status', 'message': f'skipped {skipped} candidates that could not make the top {top_k}'}))
+        ranked_developers = ranked_developers[:top_k]
 
-        # Step 3: Rank developers with progress updates
-        ranked_developers = await ranker.rank_developers_with_progress(developers, query, progress_callback=None)
+        # The full result list is the biggest payload; serialize it in the compute pool.
+        with span("serialization", developers=len(ranked_developers)):
+            final_event = await run_in_thread(done_event, ranked_developers)
 
-        # Convert to dict for JSON serialization
-        results = [dev.model_dump() for dev in ranked_developers]
+        publish(sse({'type': 'status', 'message': 'ranking complete, here are your results'}))
+        publish(final_event)
+        return ranked_developers
 
-        yield f"data: {json.dumps({'type': 'status', 'message': 'ranking complete, here are your results'})}\n\n"
-        yield f"data: {json.dumps({'type': 'done', 'results': results})}\n\n"
+searches = SearchCoalescer.from_env(run_search)
+
+@app.get("/search/{query}")
+async def search_cracked_devs(query: str, limit: int = 10, top_k: Optional[int] = Query(None, ge=1)):
+    with span("search_request", limit=limit):
+        ranked_developers = await searches.search(query, limit, top_k)
+        with span("serialization", developers=len(ranked_developers)):
+            body = await run_in_thread(dump_developers, ranked_developers)
+        return Response(body, media_type="application/json")
+
+@app.get("/search-stream/{query}")
+async def search_cracked_devs_stream(query: str, request: Request, limit: int = 10, top_k: Optional[int] = Query(None, ge=1)):
+    async def event_generator():
+        with span("search_stream_request", limit=limit):
+            # Identical concurrent requests share one run; leaving early only drops this subscriber.
+            events = searches.stream(query, limit, top_k)
+            try:
+                async for event in events:
+                    if await request.is_disconnected():
+                        return
+                    yield event
+            finally:
+                await events.aclose()
 
     return StreamingResponse(
         event_generator(),
@@ -59,3 +169,33 @@ async def search_cracked_devs_stream(query: str, limit: int = 10):
             "Connection": "keep-alive",
         }
     )
+
+@app.post("/jobs", status_code=202)
+async def create_job(job_request: JobRequest):
+    """Queues a (large) search; poll GET /jobs/{job_id} and page through /jobs/{job_id}/results."""
+    return await jobs.submit(job_request.query, job_request.limit, job_request.top_k)
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = await run_in_thread(jobs.store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.get("/jobs/{job_id}/results")
+async def get_job_results(job_id: str, offset: int = Query(0, ge=0), page_size: int = Query(50, ge=1, le=200)):
+    """Ranked results so far (provisional while the job is running), best first."""
+    job = await run_in_thread(jobs.store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    results = await run_in_thread(jobs.store.results, job_id, offset, page_size)
+    next_offset = offset + len(results)
+    body = await run_in_thread(dumps, {
+        "job_id": job_id,
+        "status": job["status"],
+        "offset": offset,
+        "total": job["results"],
+        "next_offset": next_offset if next_offset < job["results"] else None,
+        "results": results,
+    })
+    return Response(body, media_type="application/json")
@@ -0,0 +1,119 @@
+import os
+import json
+import time
+import asyncio
+import logging
+from typing import Iterable
+
+from .github_client import GitHubClient
+from .ranking import DeveloperRanker
+from .cache import normalize_query
+
+logger = logging.getLogger(__name__)
+
+def read_queries(lines: Iterable[str]) -> list[str]:
+    """Reads one query per line, skipping blanks, comments and repeats."""
+    queries = []
+    seen = set()
+    for line in lines:
+        query = line.strip()
+        if not query or query.startswith("#"):
+            continue
+        key = normalize_query(query)
+        if key in seen:
+            continue
+        seen.add(key)
+        queries.append(query)
+    return queries
+
+def read_checkpoint(output_path: str) -> set[str]:
+    """Returns the normalized queries already written to a JSONL results file."""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path) as f:
+        for line in f:
+            try:
+                done.add(normalize_query(json.loads(line)["query"]))
+            except (ValueError, KeyError, TypeError):
+                # A sweep killed mid-write can leave a truncated last line.
+                continue
+    return done
+
+def _ends_with_newline(path: str) -> bool:
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+class BatchRunner:
+    """
+    Runs many queries through one shared GitHubClient/DeveloperRanker pair.
+
+    Candidate profiles are deduplicated across the run: every search after
+    the first one only fetches logins, and profiles already fetched by an
+    earlier query are reused instead of being hydrated again (with
+    GITHUB_TWO_PHASE, the default). Ratings are deduplicated through the
+    shared rating cache, so a developer is only sent to Grok once per
+    distinct query. Each finished query is appended to the JSONL output
+    immediately, which doubles as the checkpoint for resuming.
+    """
+
+    def __init__(self, github_client: GitHubClient, ranker: DeveloperRanker, concurrency: int = 4, limit: int = 10):
+        self.github_client = github_client
+        self.ranker = ranker
+        self.concurrency = max(1, concurrency)
+        self.limit = limit
+        self.profiles = {}
+        self.reused = 0
+        self.completed = 0
+        self.failed = 0
+
+    async def _deduplicated_pages(self, query: str):
+        async for page in self.github_client.iter_candidate_pages(query, limit=self.limit, known=self.profiles):
+            for dev in page:
+                if dev.get("username") in self.profiles:
+                    self.reused += 1
+                else:
+                    self.profiles[dev.get("username")] = dev
+            yield page
+
+    async def run_query(self, query: str) -> dict:
+        started_at = time.perf_counter()
+        ranked = await self.ranker.rank_candidate_pages(self._deduplicated_pages(query), query)
+        return {
+            "query": query,
+            "results": [dev.model_dump() for dev in ranked],
+            "seconds": round(time.perf_counter() - started_at, 3),
+            "finished_at": time.time(),
+        }
+
+    async def run(self, queries: list[str], output_path: str, resume: bool = True):
+        done = read_checkpoint(output_path) if resume else set()
+        pending = [q for q in queries if normalize_query(q) not in done]
+        logger.info(f"Batch: {len(queries)} queries, {len(queries) - len(pending)} already done, {len(pending)} to run "
+                    f"(concurrency {self.concurrency}).")
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        with open(output_path, "a" if resume else "w") as out:
+            if resume and out.tell() > 0 and not _ends_with_newline(output_path):
+                # Terminate a truncated line so the next record starts cleanly.
+                out.write("\n")
+            async def worker(query: str):
+                async with semaphore:
+                    try:
+                        record = await self.run_query(query)
+                    except Exception as e:
+                        self.failed += 1
+                        logger.error(f"Batch query '{query}' failed: {e}")
+                        return
+                # Only complete records are written, so a re-run retries failures.
+                out.write(json.dumps(record) + "\n")
+                out.flush()
+                self.completed += 1
+                logger.info(f"Batch: finished '{query}' ({len(record['results'])} results, {record['seconds']}s) "
+                            f"[{self.completed}/{len(pending)}]")
+
+            await asyncio.gather(*(worker(q) for q in pending))
+
+        logger.info(f"Batch complete: {self.completed} succeeded, {self.failed} failed, "
+                    f"{len(self.profiles)} unique candidates ({self.reused} reused). Rating cache: {self.ranker.rating_cache.stats()}")
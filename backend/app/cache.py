@@ -0,0 +1,220 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from .xai_client import compact_profile
+
+logger = logging.getLogger(__name__)
+
+# Conversational filler that doesn't change what the user is looking for. Shared by
+# the cache keys and the local query parser, so both treat the same queries as equal.
+QUERY_STOPWORDS = {
+    "a", "an", "the", "me", "find", "gimme", "give", "get", "show", "some", "any", "for",
+    "please", "i", "need", "want", "looking", "who", "is", "are", "with", "and", "or", "in",
+    "of", "on", "at", "to", "that", "knows", "know", "experience", "experienced", "skilled",
+    "cracked", "good", "great", "best", "top", "amazing", "strong", "talented", "cool",
+    "someone", "people", "person", "folks", "guy", "guys", "us", "my", "team", "like",
+}
+
+def normalize_query(query: str) -> str:
+    """Lowercases a query, strips punctuation/filler and collapses whitespace."""
+    tokens = [t.rstrip(".") or t for t in re.findall(r"[a-z0-9+#.]+", query.lower())]
+    return " ".join(t for t in tokens if t not in QUERY_STOPWORDS)
+
+def profile_fingerprint(developer: dict) -> str:
+    """Hashes the profile fields that the rating prompt actually sees."""
+    payload = json.dumps(compact_profile(developer), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def rating_cache_key(query: str, developer: dict) -> str:
+    raw = f"{normalize_query(query)}\x00{profile_fingerprint(developer)}"
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+class LRUCache:
+    """A size-bounded in-memory LRU mapping."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._data:
+                return None
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+class SQLiteCache:
+    """A persistent key/value tier with TTL expiry and row-count eviction."""
+
+    def __init__(self, path: str, table: str, ttl_seconds: float, max_rows: int):
+        self.path = path
+        self.table = table
+        self.ttl_seconds = ttl_seconds
+        self.max_rows = max_rows
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_accessed_at ON {table}(accessed_at)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[dict]:
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: list[str]) -> dict[str, dict]:
+        """Looks up many keys at once; expired rows are dropped and hits touched in one commit."""
+        now = time.time()
+        found = {}
+        expired = []
+        with self._lock:
+            # Stay under SQLite's default limit on bound parameters.
+            for start in range(0, len(keys), 900):
+                chunk = keys[start:start + 900]
+                placeholders = ", ".join("?" for _ in chunk)
+                rows = self._conn.execute(
+                    f"SELECT key, value, created_at FROM {self.table} WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                for key, value, created_at in rows:
+                    if now - created_at > self.ttl_seconds:
+                        expired.append((key,))
+                    else:
+                        found[key] = value
+            if expired:
+                self._conn.executemany(f"DELETE FROM {self.table} WHERE key = ?", expired)
+            if found:
+                self._conn.executemany(f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", [(now, key) for key in found])
+            if expired or found:
+                self._conn.commit()
+        return {key: json.loads(value) for key, value in found.items()}
+
+    def set(self, key: str, value: dict):
+        self.set_many({key: value})
+
+    def set_many(self, items: dict[str, dict]):
+        if not items:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                [(key, json.dumps(value), now, now) for key, value in items.items()],
+            )
+            # Evicting on every write is wasteful; sweep every 100 writes instead.
+            if (self._writes + len(items)) // 100 > self._writes // 100:
+                self._evict(now)
+            self._writes += len(items)
+            self._conn.commit()
+
+    def _evict(self, now: float):
+        self._conn.execute(f"DELETE FROM {self.table} WHERE created_at < ?", (now - self.ttl_seconds,))
+        self._conn.execute(
+            f"DELETE FROM {self.table} WHERE key IN ("
+            f"SELECT key FROM {self.table} ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_rows,),
+        )
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+class RatingCache:
+    """
+    Two-tier cache of Grok ratings keyed by normalized query + profile fingerprint.
+
+    Lookups hit the in-process LRU first, then the SQLite tier (promoting hits
+    back into memory). Set CRAKD_CACHE_PATH to an empty string to keep the
+    cache memory-only.
+    """
+
+    def __init__(self, path: Optional[str], max_memory_entries: int, ttl_seconds: float, max_disk_entries: int):
+        self.memory = LRUCache(max_memory_entries)
+        self.disk = SQLiteCache(path, "ratings", ttl_seconds, max_disk_entries) if path else None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls) -> "RatingCache":
+        return cls(
+            path=os.getenv("CRAKD_CACHE_PATH", "crakd_cache.db"),
+            max_memory_entries=int(os.getenv("CRAKD_RATING_CACHE_MEMORY_SIZE", "10000")),
+            ttl_seconds=float(os.getenv("CRAKD_RATING_CACHE_TTL", str(7 * 24 * 3600))),
+            max_disk_entries=int(os.getenv("CRAKD_RATING_CACHE_MAX_ROWS", "200000")),
+        )
+
+    def get_many(self, query: str, developers: list[dict]) -> list[Optional[dict]]:
+        """
+        Cached ratings for each developer (None for misses), with a single
+        SQLite round trip for everything not in memory. Hashes and queries
+        SQLite, so async callers run it through compute.run_in_thread.
+        """
+        keys = [rating_cache_key(query, dev) for dev in developers]
+        ratings = [self.memory.get(key) for key in keys]
+        self.memory_hits += sum(1 for rating in ratings if rating is not None)
+        if self.disk is not None:
+            missing = [key for key, rating in zip(keys, ratings) if rating is None]
+            on_disk = self.disk.get_many(missing) if missing else {}
+            for i, key in enumerate(keys):
+                if ratings[i] is None and key in on_disk:
+                    ratings[i] = on_disk[key]
+                    self.memory.set(key, on_disk[key])
+                    self.disk_hits += 1
+        self.misses += sum(1 for rating in ratings if rating is None)
+        return [dict(rating) if rating is not None else None for rating in ratings]
+
+    def set_many(self, query: str, developers: list[dict], ratings: list[dict]):
+        # Never cache fallbacks, or a transient failure would stick for the whole TTL.
+        items = {
+            rating_cache_key(query, dev): rating
+            for dev, rating in zip(developers, ratings) if not rating.get("error")
+        }
+        for key, rating in items.items():
+            self.memory.set(key, rating)
+        if self.disk is not None:
+            self.disk.set_many(items)
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            "memory_entries": len(self.memory),
+        }
+
+_rating_cache: Optional[RatingCache] = None
+
+def get_rating_cache() -> RatingCache:
+    """Returns the process-wide rating cache."""
+    global _rating_cache
+    if _rating_cache is None:
+        _rating_cache = RatingCache.from_env()
+    return _rating_cache
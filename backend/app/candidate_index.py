@@ -0,0 +1,244 @@
+import os
+import json
+import time
+import sqlite3
+import asyncio
+import logging
+import threading
+from typing import Iterator, Optional
+
+from .telemetry import INDEX_REFRESHED
+from .compute import run_in_thread
+
+logger = logging.getLogger(__name__)
+
+# Same floor as the GitHub search qualifiers (see GitHubClient._build_graphql_search_query).
+MIN_FOLLOWERS = 100
+MIN_REPOS = 10
+
+def _phrase(text: str) -> str:
+    """Quotes text as an FTS5 phrase."""
+    return '"' + text.replace('"', '""') + '"'
+
+class CandidateIndex:
+    """
+    Local SQLite/FTS5 index of candidate profiles.
+
+    Stores the candidate dicts produced by GitHubClient with the time they
+    were fetched, and answers the same language / role / bio keyword
+    searches we send to GitHub, so repeat queries can skip the API.
+    """
+
+    def __init__(self, path: str, serve_max_age: float):
+        self.path = path
+        self.serve_max_age = serve_max_age
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS candidates ("
+            "username TEXT PRIMARY KEY, profile TEXT NOT NULL, followers INTEGER NOT NULL, "
+            "public_repos INTEGER NOT NULL, fetched_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS candidates_fetched_at ON candidates(fetched_at)")
+        # How many users GitHub reported for each search string, so a search whose
+        # whole result set is indexed doesn't go back to GitHub for more.
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS searches (query TEXT PRIMARY KEY, user_count INTEGER NOT NULL, searched_at REAL NOT NULL)"
+        )
+        # Rows share the candidates rowid. `profile` mirrors what a bare GitHub user search term
+        # matches (login, name, bio); `bio` serves `in:bio` keywords.
+        self._conn.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS candidates_fts USING fts5("
+            "profile, bio, languages, repositories, tokenize = \"unicode61 tokenchars '+#'\")"
+        )
+        self._conn.commit()
+
+    def upsert(self, developers: list[dict], fetched_at: Optional[float] = None):
+        fetched_at = fetched_at or time.time()
+        with self._lock:
+            for dev in developers:
+                username = dev.get("username")
+                if not username:
+                    continue
+                repos = dev.get("top_repositories") or []
+                self._conn.execute(
+                    "INSERT INTO candidates (username, profile, followers, public_repos, fetched_at) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(username) DO UPDATE SET profile = excluded.profile, followers = excluded.followers, "
+                    "public_repos = excluded.public_repos, fetched_at = excluded.fetched_at",
+                    (username, json.dumps(dev), dev.get("followers") or 0, dev.get("public_repos") or 0, fetched_at),
+                )
+                row = self._conn.execute("SELECT rowid FROM candidates WHERE username = ?", (username,)).fetchone()
+                self._conn.execute("DELETE FROM candidates_fts WHERE rowid = ?", (row[0],))
+                self._conn.execute(
+                    "INSERT INTO candidates_fts (rowid, profile, bio, languages, repositories) VALUES (?, ?, ?, ?, ?)",
+                    (
+                        row[0],
+                        " ".join(filter(None, [username, dev.get("name"), dev.get("bio")])),
+                        dev.get("bio") or "",
+                        " ".join(sorted({repo.get("language") for repo in repos if repo.get("language")})),
+                        " ".join(filter(None, (f"{repo.get('name') or ''} {repo.get('description') or ''}" for repo in repos))),
+                    ),
+                )
+            self._conn.commit()
+
+    def search(self, language: Optional[str] = None, role: Optional[str] = None,
+               keyword: Optional[str] = None, limit: int = 10) -> list[dict]:
+        """Fresh profiles matching every given term, most followed first."""
+        terms = []
+        if language:
+            terms.append(f"languages : {_phrase(language)}")
+        if role:
+            terms.append(f"profile : {_phrase(role)}")
+        if keyword:
+            terms.append(f"bio : {_phrase(keyword)}")
+        sql = ("SELECT c.profile FROM candidates c {join} WHERE {match} c.followers > ? AND c.public_repos > ? "
+               "AND c.fetched_at >= ? ORDER BY c.followers DESC LIMIT ?")
+        params = [MIN_FOLLOWERS, MIN_REPOS, time.time() - self.serve_max_age, limit]
+        if terms:
+            sql = sql.format(join="JOIN candidates_fts f ON f.rowid = c.rowid", match="candidates_fts MATCH ? AND")
+            params.insert(0, " AND ".join(terms))
+        else:
+            sql = sql.format(join="", match="")
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def get_fresh(self, usernames: list[str]) -> dict[str, dict]:
+        """Indexed profiles for the given usernames fetched within serve_max_age, keyed by username."""
+        if not usernames:
+            return {}
+        placeholders = ", ".join("?" for _ in usernames)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT username, profile FROM candidates WHERE username IN ({placeholders}) AND fetched_at >= ?",
+                (*usernames, time.time() - self.serve_max_age),
+            ).fetchall()
+        return {row[0]: json.loads(row[1]) for row in rows}
+
+    def record_search(self, query: str, user_count: int):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO searches (query, user_count, searched_at) VALUES (?, ?, ?)",
+                (query, user_count, time.time()),
+            )
+            self._conn.commit()
+
+    def known_user_count(self, query: str) -> Optional[int]:
+        """GitHub's userCount for a search string, if it was recorded within serve_max_age."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT user_count FROM searches WHERE query = ? AND searched_at >= ?",
+                (query, time.time() - self.serve_max_age),
+            ).fetchone()
+        return row[0] if row else None
+
+    def stale(self, max_age: float, limit: int) -> list[str]:
+        """Usernames fetched more than max_age seconds ago, oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT username FROM candidates WHERE fetched_at < ? ORDER BY fetched_at LIMIT ?",
+                (time.time() - max_age, limit),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def remove(self, usernames: list[str]):
+        with self._lock:
+            for username in usernames:
+                row = self._conn.execute("SELECT rowid FROM candidates WHERE username = ?", (username,)).fetchone()
+                if row is None:
+                    continue
+                self._conn.execute("DELETE FROM candidates_fts WHERE rowid = ?", (row[0],))
+                self._conn.execute("DELETE FROM candidates WHERE rowid = ?", (row[0],))
+            self._conn.commit()
+
+    def iter_profiles(self) -> Iterator[dict]:
+        """Every indexed profile, regardless of age."""
+        with self._lock:
+            rows = self._conn.execute("SELECT profile FROM candidates ORDER BY rowid").fetchall()
+        for row in rows:
+            yield json.loads(row[0])
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+class IndexRefresher:
+    """
+    Background task that re-hydrates the stalest indexed profiles from
+    GitHub, a batch at a time, while the GraphQL budget allows it.
+    """
+
+    def __init__(self, index: CandidateIndex, github_client, interval: float, max_age: float, batch_size: int):
+        self.index = index
+        self.github_client = github_client
+        self.interval = interval
+        self.max_age = max_age
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_env(cls, index: CandidateIndex, github_client) -> "IndexRefresher":
+        return cls(
+            index,
+            github_client,
+            interval=float(os.getenv("CRAKD_INDEX_REFRESH_INTERVAL", "600")),
+            max_age=float(os.getenv("CRAKD_INDEX_REFRESH_AGE", str(24 * 3600))),
+            batch_size=int(os.getenv("CRAKD_INDEX_REFRESH_BATCH", "50")),
+        )
+
+    async def refresh_once(self) -> int:
+        """Re-fetches up to batch_size stale profiles; returns how many were refreshed."""
+        usernames = await run_in_thread(self.index.stale, self.max_age, self.batch_size)
+        if not usernames:
+            return 0
+        if not self.github_client.can_afford(len(usernames)):
+            logger.info("Skipping candidate index refresh to preserve GitHub rate limit budget.")
+            return 0
+        profiles = await self.github_client.fetch_users(usernames)
+        await run_in_thread(self.index.upsert, profiles)
+        # Logins that no longer resolve (renamed or deleted accounts) are dropped.
+        found = {profile["username"] for profile in profiles}
+        missing = [username for username in usernames if username not in found]
+        await run_in_thread(self.index.remove, missing)
+        INDEX_REFRESHED.labels("refreshed").inc(len(profiles))
+        INDEX_REFRESHED.labels("removed").inc(len(missing))
+        logger.info(f"Candidate index: refreshed {len(profiles)} stale profiles, removed {len(missing)}.")
+        return len(profiles)
+
+    async def _run(self):
+        while True:
+            try:
+                await self.refresh_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Candidate index refresh failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+_candidate_index: Optional[CandidateIndex] = None
+
+def get_candidate_index() -> Optional[CandidateIndex]:
+    """Returns the process-wide candidate index, or None when CRAKD_INDEX_PATH is empty."""
+    global _candidate_index
+    path = os.getenv("CRAKD_INDEX_PATH", "crakd_index.db")
+    if _candidate_index is None and path:
+        _candidate_index = CandidateIndex(path, float(os.getenv("CRAKD_INDEX_SERVE_MAX_AGE", str(7 * 24 * 3600))))
+    return _candidate_index
@@ -0,0 +1,153 @@
+import os
+import time
+import asyncio
+import logging
+from typing import AsyncIterator, Awaitable, Callable, Optional
+
+from .cache import LRUCache, normalize_query
+from .telemetry import SEARCH_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+# run(query, limit, top_k, publish) -> results; publish() appends an event for every subscriber.
+SearchPipeline = Callable[[str, int, Optional[int], Callable[[str], None]], Awaitable[list]]
+
+SearchKey = tuple[str, int, Optional[int]]
+
+class SearchFlight:
+    """One search pipeline run and the progress events it has published so far."""
+
+    def __init__(self, key: SearchKey):
+        self.key = key
+        self.events: list[str] = []
+        self.subscribers = 0
+        self.task: Optional[asyncio.Task] = None
+        self.finished_at: Optional[float] = None
+        self._updated = asyncio.Event()
+
+    def publish(self, event: str):
+        self.events.append(event)
+        self._notify()
+
+    def _notify(self):
+        self._updated.set()
+        self._updated = asyncio.Event()
+
+    async def follow(self) -> AsyncIterator[str]:
+        """Replays the events published so far, then yields new ones until the run ends."""
+        sent = 0
+        while True:
+            updated = self._updated
+            while sent < len(self.events):
+                yield self.events[sent]
+                sent += 1
+            if self.task.done():
+                # Surfaces the pipeline's exception to every subscriber.
+                self.task.result()
+                return
+            await updated.wait()
+
+    async def result(self) -> list:
+        # Shielded so one waiter going away doesn't cancel the run for the others.
+        return await asyncio.shield(self.task)
+
+class SearchCoalescer:
+    """
+    Single-flight layer in front of the search pipeline.
+
+    Requests are keyed on normalized query, limit and top_k. Identical concurrent
+    requests attach to the same in-flight run (streaming subscribers replay
+    its events and then follow it live), and finished runs are kept for a
+    short TTL so repeat hits are served without touching GitHub or Grok. A
+    run is cancelled once its last subscriber goes away.
+    """
+
+    def __init__(self, run: SearchPipeline, result_ttl: float, max_results: int):
+        self.run = run
+        self.result_ttl = result_ttl
+        self.results = LRUCache(max_results)
+        self.inflight: dict[SearchKey, SearchFlight] = {}
+        self.started = 0
+        self.joined = 0
+        self.cache_hits = 0
+
+    @classmethod
+    def from_env(cls, run: SearchPipeline) -> "SearchCoalescer":
+        return cls(
+            run,
+            result_ttl=float(os.getenv("CRAKD_RESULT_CACHE_TTL", "60")),
+            max_results=int(os.getenv("CRAKD_RESULT_CACHE_SIZE", "256")),
+        )
+
+    def _flight(self, query: str, limit: int, top_k: Optional[int]) -> SearchFlight:
+        key = (normalize_query(query), limit, top_k)
+        cached = self.results.get(key)
+        if cached is not None and time.monotonic() - cached.finished_at < self.result_ttl:
+            self.cache_hits += 1
+            SEARCH_REQUESTS.labels("cached").inc()
+            return cached
+
+        flight = self.inflight.get(key)
+        if flight is not None:
+            self.joined += 1
+            SEARCH_REQUESTS.labels("joined").inc()
+            return flight
+
+        flight = SearchFlight(key)
+        flight.task = asyncio.ensure_future(self.run(query, limit, top_k, flight.publish))
+        flight.task.add_done_callback(lambda task: self._finish(flight))
+        self.inflight[key] = flight
+        self.started += 1
+        SEARCH_REQUESTS.labels("started").inc()
+        return flight
+
+    def _finish(self, flight: SearchFlight):
+        if self.inflight.get(flight.key) is flight:
+            del self.inflight[flight.key]
+        flight._notify()
+        if flight.task.cancelled():
+            return
+        if flight.task.exception() is not None:
+            # Failures are not cached; the next request starts a fresh run.
+            logger.error(f"Search '{flight.key[0]}' (limit {flight.key[1]}) failed: {flight.task.exception()}")
+            return
+        flight.finished_at = time.monotonic()
+        if self.result_ttl > 0:
+            self.results.set(flight.key, flight)
+
+    def _leave(self, flight: SearchFlight):
+        flight.subscribers -= 1
+        if flight.subscribers == 0 and not flight.task.done():
+            logger.info(f"All subscribers left search '{flight.key[0]}', cancelling it.")
+            # Detach first so a request arriving mid-cancellation starts a new run.
+            if self.inflight.get(flight.key) is flight:
+                del self.inflight[flight.key]
+            flight.task.cancel()
+
+    async def search(self, query: str, limit: int, top_k: Optional[int] = None) -> list:
+        """Returns the ranked results, sharing the run with identical concurrent requests."""
+        flight = self._flight(query, limit, top_k)
+        flight.subscribers += 1
+        try:
+            return await flight.result()
+        finally:
+            self._leave(flight)
+
+    async def stream(self, query: str, limit: int, top_k: Optional[int] = None) -> AsyncIterator[str]:
+        """Yields the run's progress events, from the beginning, as they are published."""
+        flight = self._flight(query, limit, top_k)
+        flight.subscribers += 1
+        try:
+            async for event in flight.follow():
+                yield event
+        finally:
+            self._leave(flight)
+
+    def stats(self) -> dict:
+        return {
+            "started": self.started,
+            "joined": self.joined,
+            "cache_hits": self.cache_hits,
+            "inflight": len(self.inflight),
+            "cached_results": len(self.results),
+        }
@@ -0,0 +1,67 @@
+import os
+import json
+import asyncio
+import logging
+import functools
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+try:
+    import orjson
+except ImportError:
+    # Optional speedup (`pip install crakd-backend[speedups]`); stdlib json is the fallback.
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+_thread_pool: Optional[ThreadPoolExecutor] = None
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+def get_thread_pool() -> ThreadPoolExecutor:
+    """Threads for scoring and serialization; NumPy releases the GIL for the heavy parts."""
+    global _thread_pool
+    if _thread_pool is None:
+        workers = int(os.getenv("CRAKD_COMPUTE_THREADS", str(min(4, os.cpu_count() or 1))))
+        _thread_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="crakd-compute")
+    return _thread_pool
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Processes for PCA and plotting, which hold the GIL and aren't thread-safe (matplotlib)."""
+    global _process_pool
+    if _process_pool is None:
+        workers = int(os.getenv("CRAKD_COMPUTE_PROCESSES", "1"))
+        # Spawned rather than forked: the parent already runs HTTP client threads.
+        _process_pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    return _process_pool
+
+async def _run(executor: Executor, fn: Callable, *args, **kwargs) -> Any:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(fn, *args, **kwargs))
+
+async def run_in_thread(fn: Callable, *args, **kwargs) -> Any:
+    """Runs CPU-bound work off the event loop in the shared thread pool."""
+    return await _run(get_thread_pool(), fn, *args, **kwargs)
+
+async def run_in_process(fn: Callable, *args, **kwargs) -> Any:
+    """Runs `fn` in the process pool; it and its arguments must be picklable."""
+    return await _run(get_process_pool(), fn, *args, **kwargs)
+
+def shutdown_executors():
+    global _thread_pool, _process_pool
+    if _thread_pool is not None:
+        _thread_pool.shutdown(wait=False)
+        _thread_pool = None
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=True)
+        _process_pool = None
+
+def dumps(obj: Any) -> bytes:
+    """Compact JSON, with orjson when it is installed (NumPy scalars included)."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+def dump_developers(developers: list) -> bytes:
+    """Serializes ranked Developer models into a JSON array."""
+    return dumps([dev.model_dump() for dev in developers])
@@ -0,0 +1,106 @@
+import os
+import json
+import logging
+import sqlite3
+from typing import Iterator, Optional
+
+import numpy as np
+
+from .features import FEATURE_NAMES
+
+logger = logging.getLogger(__name__)
+
+# Rows read (or copied) at a time, so a pass over the store never loads it whole.
+CHUNK_ROWS = 4096
+INITIAL_CAPACITY = 1024
+
+class FeatureStore:
+    """
+    Memory-mapped matrix of candidate features that accumulates across runs.
+
+    `features.npy` holds one row per username (grown by doubling) and
+    `rows.db` maps usernames to rows, so a candidate seen again updates its
+    row in place and opening the store doesn't load every username.
+    Meant for one writer at a time (the CLI).
+    """
+
+    def __init__(self, path: str, feature_names: tuple = FEATURE_NAMES):
+        self.path = path
+        self.feature_names = list(feature_names)
+        self.data_path = os.path.join(path, "features.npy")
+        os.makedirs(path, exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(path, "rows.db"))
+        self._conn.execute("CREATE TABLE IF NOT EXISTS rows (username TEXT PRIMARY KEY, row INTEGER NOT NULL)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+
+        stored = self._conn.execute("SELECT value FROM meta WHERE key = 'feature_names'").fetchone()
+        # True when this opened an empty store, so models fitted on an older one no longer apply.
+        self.created = stored is None or json.loads(stored[0]) != self.feature_names or not os.path.exists(self.data_path)
+        if self.created:
+            if stored is not None:
+                logger.warning(f"Feature set changed; starting a new feature store in {path}.")
+            self._conn.execute("DELETE FROM rows")
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('feature_names', ?)", (json.dumps(self.feature_names),)
+            )
+            self._conn.commit()
+            self._data = np.lib.format.open_memmap(
+                self.data_path, mode="w+", dtype=np.float64, shape=(INITIAL_CAPACITY, len(self.feature_names))
+            )
+        else:
+            self._data = np.lib.format.open_memmap(self.data_path, mode="r+")
+        self._length = self._conn.execute("SELECT COUNT(*) FROM rows").fetchone()[0]
+
+    def __len__(self):
+        return self._length
+
+    def _grow(self, rows: int):
+        capacity = max(rows, 2 * len(self._data))
+        tmp_path = self.data_path + ".tmp"
+        grown = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float64, shape=(capacity, self._data.shape[1]))
+        for start in range(0, len(self), CHUNK_ROWS):
+            stop = min(start + CHUNK_ROWS, len(self))
+            grown[start:stop] = self._data[start:stop]
+        grown.flush()
+        del grown
+        del self._data
+        os.replace(tmp_path, self.data_path)
+        self._data = np.lib.format.open_memmap(self.data_path, mode="r+")
+
+    def _known_rows(self, usernames: list[str]) -> dict[str, int]:
+        known = {}
+        # Stay under SQLite's default limit on bound parameters.
+        for start in range(0, len(usernames), 900):
+            chunk = usernames[start:start + 900]
+            placeholders = ", ".join("?" for _ in chunk)
+            known.update(self._conn.execute(f"SELECT username, row FROM rows WHERE username IN ({placeholders})", chunk))
+        return known
+
+    def add(self, features: np.ndarray, usernames: list[str]) -> int:
+        """Stores (or updates) one row per username; returns how many rows were new."""
+        rows = self._known_rows(usernames)
+        new = []
+        for username in usernames:
+            if username not in rows:
+                rows[username] = self._length + len(new)
+                new.append((username, rows[username]))
+        if self._length + len(new) > len(self._data):
+            self._grow(self._length + len(new))
+        self._data[[rows[username] for username in usernames]] = features
+        self._data.flush()
+        # Rows are only registered once their features are on disk.
+        self._conn.executemany("INSERT INTO rows (username, row) VALUES (?, ?)", new)
+        self._conn.commit()
+        self._length += len(new)
+        return len(new)
+
+    def chunks(self, start: int = 0, stop: Optional[int] = None) -> Iterator[np.ndarray]:
+        """Yields rows start..stop (default: all) as memory-mapped chunks of up to CHUNK_ROWS."""
+        stop = len(self) if stop is None else stop
+        for begin in range(start, stop, CHUNK_ROWS):
+            yield self._data[begin:min(begin + CHUNK_ROWS, stop)]
+
+    def close(self):
+        """Closes rows.db and unmaps features.npy."""
+        self._conn.close()
+        del self._data
@@ -0,0 +1,200 @@
+import os
+import re
+import logging
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# The search query asks GitHub for each user's top 5 repositories.
+MAX_REPOS = 5
+
+# Columns of the feature matrix, in order.
+FEATURE_NAMES = ("followers", "public_repos", "avg_stars", "avg_forks")
+
+NORMALIZATIONS = ("sum_max", "log", "percentile")
+
+def _column(values, n: int) -> np.ndarray:
+    return np.fromiter((v or 0 for v in values), dtype=np.float64, count=n)
+
+class CandidateStore:
+    """
+    Columnar storage for candidate profiles.
+
+    Scalar counts are 1-D arrays; per-repository stats are (N, MAX_REPOS)
+    arrays padded with zeros, with `repo_mask` marking the real entries.
+    """
+
+    def __init__(self, usernames: list[str], followers: np.ndarray, following: np.ndarray,
+                 public_repos: np.ndarray, contributions: np.ndarray, repo_stars: np.ndarray,
+                 repo_forks: np.ndarray, repo_mask: np.ndarray):
+        self.usernames = usernames
+        self.followers = followers
+        self.following = following
+        self.public_repos = public_repos
+        self.contributions = contributions
+        self.repo_stars = repo_stars
+        self.repo_forks = repo_forks
+        self.repo_mask = repo_mask
+
+    def __len__(self):
+        return len(self.usernames)
+
+    @classmethod
+    def from_developers(cls, developers: list[dict]) -> "CandidateStore":
+        """Builds the store from the candidate dicts produced by GitHubClient."""
+        n = len(developers)
+        repo_stars = np.zeros((n, MAX_REPOS), dtype=np.float64)
+        repo_forks = np.zeros((n, MAX_REPOS), dtype=np.float64)
+        repo_mask = np.zeros((n, MAX_REPOS), dtype=bool)
+        for i, dev in enumerate(developers):
+            repos = (dev.get("top_repositories") or [])[:MAX_REPOS]
+            for j, repo in enumerate(repos):
+                repo_stars[i, j] = repo.get("stargazers_count") or 0
+                repo_forks[i, j] = repo.get("forks_count") or 0
+            repo_mask[i, :len(repos)] = True
+        return cls(
+            usernames=[dev.get("username") for dev in developers],
+            followers=_column((dev.get("followers") for dev in developers), n),
+            following=_column((dev.get("following") for dev in developers), n),
+            public_repos=_column((dev.get("public_repos") for dev in developers), n),
+            contributions=_column((dev.get("total_contributions") for dev in developers), n),
+            repo_stars=repo_stars,
+            repo_forks=repo_forks,
+            repo_mask=repo_mask,
+        )
+
+    def feature_matrix(self) -> np.ndarray:
+        """Returns the (N, len(FEATURE_NAMES)) feature matrix."""
+        repo_counts = self.repo_mask.sum(axis=1)
+        # Developers without repositories average to 0 rather than NaN.
+        denom = np.maximum(repo_counts, 1)
+        avg_stars = (self.repo_stars * self.repo_mask).sum(axis=1) / denom
+        avg_forks = (self.repo_forks * self.repo_mask).sum(axis=1) / denom
+        return np.column_stack([self.followers, self.public_repos, avg_stars, avg_forks])
+
+class ReferenceDistribution:
+    """Sorted per-feature reference values used for log scaling and percentile ranks."""
+
+    def __init__(self, sorted_columns: np.ndarray):
+        # Shape (M, len(FEATURE_NAMES)); each column sorted ascending.
+        self.sorted_columns = sorted_columns
+
+    @classmethod
+    def fit(cls, features: np.ndarray) -> "ReferenceDistribution":
+        return cls(np.sort(features, axis=0))
+
+    @property
+    def maxima(self) -> np.ndarray:
+        return self.sorted_columns[-1]
+
+    def percentiles(self, features: np.ndarray) -> np.ndarray:
+        """Fraction of the reference at or below each value, per column (0-1)."""
+        ranks = np.empty_like(features, dtype=np.float64)
+        for j in range(features.shape[1]):
+            ranks[:, j] = np.searchsorted(self.sorted_columns[:, j], features[:, j], side="right")
+        return ranks / len(self.sorted_columns)
+
+    def save(self, path: str):
+        np.save(path, self.sorted_columns)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["ReferenceDistribution"]:
+        if not path or not os.path.exists(path):
+            return None
+        return cls(np.load(path))
+
+def _batch_percentiles(features: np.ndarray) -> np.ndarray:
+    # Ranked against the batch itself, so tied values share a percentile.
+    return ReferenceDistribution.fit(features).percentiles(features)
+
+def normalize_features(features: np.ndarray, method: str, reference: Optional[ReferenceDistribution] = None) -> np.ndarray:
+    """
+    Scales each feature column into 0-1.
+
+    "log" divides log1p(x) by log1p of the reference (or batch) maximum.
+    "percentile" ranks against the reference distribution (or within the batch).
+    """
+    if method == "log":
+        logged = np.log1p(np.maximum(features, 0))
+        maxima = reference.maxima if reference is not None else features.max(axis=0, initial=0)
+        scale = np.log1p(np.maximum(maxima, 0))
+        return np.clip(np.divide(logged, scale, out=np.zeros_like(logged), where=scale > 0), 0, 1)
+    if method == "percentile":
+        if reference is not None:
+            return reference.percentiles(features)
+        return _batch_percentiles(features)
+    raise ValueError(f"Unknown normalization '{method}', expected one of {NORMALIZATIONS}")
+
+def score_features(features: np.ndarray, method: str = "sum_max", weights: Optional[np.ndarray] = None,
+                   reference: Optional[ReferenceDistribution] = None) -> np.ndarray:
+    """
+    Scores a feature matrix into 0-100 GitHub scores in one vectorized pass.
+
+    "sum_max" is the original behaviour: raw feature sums relative to the
+    highest sum in the batch.
+    """
+    if features.shape[0] == 0:
+        return np.zeros(0)
+    if method == "sum_max":
+        feature_sums = np.sum(features, axis=1)
+        max_score = np.max(feature_sums)
+        if max_score > 0:
+            return (feature_sums / max_score) * 100
+        return np.zeros(len(features))
+
+    normalized = normalize_features(features, method, reference)
+    if weights is None:
+        weights = np.full(features.shape[1], 1.0 / features.shape[1])
+    else:
+        weights = np.asarray(weights, dtype=np.float64) / np.sum(weights)
+    return normalized @ weights * 100
+
+def lexical_scores(developers: list[dict], terms: list[str]) -> np.ndarray:
+    """
+    Fraction of the query terms found in each profile's bio, repository names,
+    descriptions and languages (0-1). Every profile scores 1 when there are no terms.
+    """
+    if not terms:
+        return np.ones(len(developers))
+    scores = np.zeros(len(developers))
+    for i, dev in enumerate(developers):
+        fields = [dev.get("bio") or ""]
+        for repo in dev.get("top_repositories") or []:
+            fields.extend([repo.get("name") or "", repo.get("description") or "", repo.get("language") or ""])
+        words = {word.rstrip(".") for word in re.findall(r"[a-z0-9+#.]+", " ".join(fields).lower())}
+        scores[i] = sum(1 for term in terms if term in words) / len(terms)
+    return scores
+
+def parse_weights(value: Optional[str]) -> Optional[np.ndarray]:
+    """Parses comma-separated weights (one per FEATURE_NAMES entry)."""
+    if not value:
+        return None
+    weights = np.array([float(w) for w in value.split(",")], dtype=np.float64)
+    if len(weights) != len(FEATURE_NAMES):
+        raise ValueError(f"Expected {len(FEATURE_NAMES)} weights for {FEATURE_NAMES}, got {len(weights)}")
+    return weights
+
+def main():
+    # Builds the reference distribution (CRAKD_REFERENCE_PATH) from every profile in the candidate index.
+    import argparse
+    from .candidate_index import CandidateIndex
+
+    parser = argparse.ArgumentParser(description="Build the GitHub score reference distribution from the candidate index")
+    parser.add_argument("--index", type=str, default=os.getenv("CRAKD_INDEX_PATH", "crakd_index.db"))
+    parser.add_argument("--output", type=str, default=os.getenv("CRAKD_REFERENCE_PATH", "reference_distribution.npy"))
+    args = parser.parse_args()
+
+    index = CandidateIndex(args.index, serve_max_age=float("inf"))
+    try:
+        features = CandidateStore.from_developers(list(index.iter_profiles())).feature_matrix()
+    finally:
+        index.close()
+    if len(features) == 0:
+        raise SystemExit(f"No candidates in {args.index}; run some searches first.")
+    ReferenceDistribution.fit(features).save(args.output)
+    print(f"Wrote reference distribution over {len(features)} candidates to {args.output}")
+
+if __name__ == '__main__':
+    main()
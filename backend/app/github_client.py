@@ -1,24 +1,246 @@
 import os
 import asyncio
+import logging
+import functools
+from typing import AsyncIterator, Optional
+import aiohttp
 from gql import gql, Client
 from gql.transport.aiohttp import AIOHTTPTransport
+from gql.transport.exceptions import TransportQueryError
+from graphql import print_schema
 from .utils import parse_query_with_ai
+from .telemetry import CANDIDATE_SOURCES, GITHUB_POINTS_PER_SEARCH, span, record_github_rate_limit
+from .candidate_index import MIN_FOLLOWERS, MIN_REPOS, get_candidate_index
+from .compute import run_in_thread
+
+logger = logging.getLogger(__name__)
+
+GITHUB_GRAPHQL_URL = "https://api.github.com/graphql"
+
+# GitHub's search API never returns more than 1000 results, 100 per page.
+MAX_SEARCH_RESULTS = 1000
+MAX_PAGE_SIZE = 100
+# Aliased user(login:) lookups per hydration request.
+MAX_USERS_PER_QUERY = 50
+# GitHub caps nodes(ids:) at 100 ids per request.
+MAX_NODES_PER_QUERY = 100
+# Starting estimate of the rate limit points one fully hydrated user costs
+# (followers, following, top repositories and contributions), refined as
+# hydration responses report their actual cost.
+HYDRATE_POINTS_PER_USER = 0.03
+
+USER_FIELDS = """
+    fragment UserFields on User {
+      id
+      login
+      name
+      bio
+      avatarUrl
+      url
+      followers {
+        totalCount
+      }
+      following {
+        totalCount
+      }
+      repositories(first: 5, orderBy: {field: STARGAZERS, direction: DESC}) {
+        totalCount
+        nodes {
+          name
+          stargazerCount
+          forkCount
+          description
+          primaryLanguage {
+            name
+          }
+        }
+      }
+      contributionsCollection {
+        contributionCalendar {
+          totalContributions
+        }
+      }
+    }
+"""
+
+RATE_LIMIT_FIELDS = """
+      rateLimit {
+        limit
+        cost
+        remaining
+        resetAt
+      }
+"""
+
+SEARCH_QUERY = gql("""
+    query search($query_str: String!, $limit: Int!, $cursor: String) {""" + RATE_LIMIT_FIELDS + """
+      search(query: $query_str, type: USER, first: $limit, after: $cursor) {
+        userCount
+        pageInfo {
+          endCursor
+          hasNextPage
+        }
+        nodes {
+          ...UserFields
+        }
+      }
+    }
+""" + USER_FIELDS)
+
+# Phase one of a two-phase search: only what's needed to pick and dedupe hits.
+LIGHT_SEARCH_QUERY = gql("""
+    query lightSearch($query_str: String!, $limit: Int!, $cursor: String) {""" + RATE_LIMIT_FIELDS + """
+      search(query: $query_str, type: USER, first: $limit, after: $cursor) {
+        userCount
+        pageInfo {
+          endCursor
+          hasNextPage
+        }
+        nodes {
+          ... on User {
+            id
+            login
+          }
+        }
+      }
+    }
+""")
+
+# Phase two: full profiles for the hits we keep.
+HYDRATE_QUERY = gql("""
+    query hydrate($ids: [ID!]!) {""" + RATE_LIMIT_FIELDS + """
+      nodes(ids: $ids) {
+        ...UserFields
+      }
+    }
+""" + USER_FIELDS)
+
+@functools.lru_cache(maxsize=None)
+def users_query(count: int):
+    """A document fetching `count` users by login through aliased user(login:) fields."""
+    variables = ", ".join(f"$login{i}: String!" for i in range(count))
+    fields = "\n".join(f"      u{i}: user(login: $login{i}) {{ ...UserFields }}" for i in range(count))
+    return gql(f"query users({variables}) {{{RATE_LIMIT_FIELDS}{fields}\n    }}" + USER_FIELDS)
+
+def parse_user_node(user_node: dict) -> dict:
+    """Converts a GraphQL User node into the candidate dict used across the app."""
+    top_repos = []
+    # Gracefully handle cases where repositories or their nodes are None
+    for repo in (user_node.get('repositories') or {}).get('nodes') or []:
+        if not repo: continue
+        top_repos.append({
+            "name": repo.get('name'),
+            "stargazers_count": repo.get('stargazerCount'),
+            "forks_count": repo.get('forkCount'),
+            "description": repo.get('description'),
+            "language": (repo.get('primaryLanguage') or {}).get('name')
+        })
+
+    # Safely access nested fields
+    followers_count = (user_node.get('followers') or {}).get('totalCount')
+    following_count = (user_node.get('following') or {}).get('totalCount')
+    public_repos_count = (user_node.get('repositories') or {}).get('totalCount')
+    total_contributions = (user_node.get('contributionsCollection') or {}).get('contributionCalendar', {}).get('totalContributions', 0)
+
+    return {
+        "username": user_node.get('login'),
+        "name": user_node.get('name'),
+        "bio": user_node.get('bio'),
+        "avatar_url": user_node.get('avatarUrl'),
+        "html_url": user_node.get('url'),
+        "followers": followers_count,
+        "following": following_count,
+        "public_repos": public_repos_count,
+        "total_contributions": total_contributions,
+        "top_repositories": top_repos
+    }
 
 class GitHubClient:
-    def __init__(self):
+    def __init__(self, url: Optional[str] = None):
+        self.url = url or os.getenv("GITHUB_GRAPHQL_URL", GITHUB_GRAPHQL_URL)
         self.github_token = os.getenv("GITHUB_TOKEN")
         if not self.github_token:
             raise ValueError("GITHUB_TOKEN environment variable not set")
-        
-        self.transport = AIOHTTPTransport(
-            url="https://api.github.com/graphql",
-            headers={'Authorization': f'bearer {self.github_token}'}
+
+        # The transport and session are created lazily inside the running loop
+        # and then reused for the life of the process (see connect()).
+        self.client = None
+        self._session = None
+        self._session_loop = None
+        self._connect_lock = None
+        self.schema_path = os.getenv("GITHUB_SCHEMA_PATH", "github_schema.graphql")
+        self.max_connections = int(os.getenv("GITHUB_MAX_CONNECTIONS", "10"))
+        self.page_size = max(1, min(int(os.getenv("GITHUB_PAGE_SIZE", str(MAX_PAGE_SIZE))), MAX_PAGE_SIZE))
+        self.max_candidates = min(int(os.getenv("GITHUB_MAX_CANDIDATES", str(MAX_SEARCH_RESULTS))), MAX_SEARCH_RESULTS)
+        # Stop paginating once the remaining GraphQL budget would drop below this.
+        self.rate_limit_floor = int(os.getenv("GITHUB_RATE_LIMIT_FLOOR", "100"))
+        # The most recent rateLimit block from any request.
+        self.last_rate_limit = {}
+        self.index = get_candidate_index()
+        # Search ids first and hydrate only the hits we keep; GITHUB_TWO_PHASE=0 restores
+        # single-phase searches that return full profiles.
+        self.two_phase = os.getenv("GITHUB_TWO_PHASE", "1") != "0"
+        self.hydrate_batch_size = max(1, min(int(os.getenv("GITHUB_HYDRATE_BATCH_SIZE", str(MAX_NODES_PER_QUERY))), MAX_NODES_PER_QUERY))
+        self.points_per_user = HYDRATE_POINTS_PER_USER
+        self.search_count = 0
+        self.search_points = 0
+
+    def _load_schema(self) -> Optional[str]:
+        """Returns the cached GitHub SDL if present. Without it, queries are sent unvalidated."""
+        if self.schema_path and os.path.exists(self.schema_path):
+            with open(self.schema_path) as f:
+                return f.read()
+        return None
+
+    def _build_transport(self) -> AIOHTTPTransport:
+        connector = aiohttp.TCPConnector(limit=self.max_connections, ttl_dns_cache=300, keepalive_timeout=60)
+        return AIOHTTPTransport(
+            url=self.url,
+            headers={'Authorization': f'bearer {self.github_token}'},
+            client_session_args={"connector": connector},
         )
-        self.client = Client(transport=self.transport, fetch_schema_from_transport=True)
+
+    async def connect(self):
+        """Opens (or returns) the long-lived, reconnecting GraphQL session."""
+        loop = asyncio.get_running_loop()
+        if self._session is not None and self._session_loop is loop:
+            return self._session
+        if self._connect_lock is None or self._session_loop is not loop:
+            self._connect_lock = asyncio.Lock()
+            self._session_loop = loop
+            self._session = None
+        async with self._connect_lock:
+            if self._session is None:
+                # Never introspect: GitHub's schema is huge and doesn't change per request.
+                self.client = Client(
+                    transport=self._build_transport(),
+                    schema=self._load_schema(),
+                    fetch_schema_from_transport=False,
+                )
+                self._session = await self.client.connect_async(reconnecting=True)
+                logger.info("Opened persistent GitHub GraphQL session.")
+        return self._session
+
+    async def close(self):
+        """Closes the persistent GraphQL session."""
+        if self._session is not None and self.client is not None:
+            await self.client.close_async()
+            logger.info("Closed persistent GitHub GraphQL session.")
+        self._session = None
+        self.client = None
+
+    async def cache_schema(self):
+        """Introspects GitHub once and writes the SDL to GITHUB_SCHEMA_PATH."""
+        client = Client(transport=self._build_transport(), fetch_schema_from_transport=True)
+        async with client:
+            pass
+        with open(self.schema_path, "w") as f:
+            f.write(print_schema(client.schema))
+        print(f"Cached GitHub GraphQL schema to {self.schema_path}")
 
     def _build_graphql_search_query(self, language=None, role=None, primary_keyword=None):
         """Builds a GitHub GraphQL search query string."""
-        query_parts = ["type:user", "followers:>100", "repos:>10"]
+        query_parts = ["type:user", f"followers:>{MIN_FOLLOWERS}", f"repos:>{MIN_REPOS}"]
         if language:
             query_parts.append(f"language:{language}")
         
@@ -32,115 +254,290 @@ class GitHubClient:
             
         return " ".join(query_parts)
 
-    async def find_cracked_developers(self, query: str, limit: int = 10) -> list[dict]:
-        """Finds developers using a single, efficient GraphQL query."""
-        parsed_query = await parse_query_with_ai(query)
+    def _can_afford_next_page(self, rate_limit: dict) -> bool:
+        """Checks the last reported rateLimit block against the configured floor."""
+        if not rate_limit:
+            return True
+        remaining = rate_limit.get('remaining') or 0
+        cost = rate_limit.get('cost') or 1
+        return remaining - cost >= self.rate_limit_floor
+
+    def can_afford(self, points: int = 1) -> bool:
+        """Checks whether spending `points` more would keep the budget above the floor."""
+        if not self.last_rate_limit:
+            return True
+        return (self.last_rate_limit.get('remaining') or 0) - points >= self.rate_limit_floor
+
+    def _record_rate_limit(self, rate_limit: Optional[dict], tally: Optional[dict] = None):
+        if rate_limit:
+            self.last_rate_limit = rate_limit
+            if tally is not None:
+                tally["points"] += rate_limit.get('cost') or 0
+        record_github_rate_limit(rate_limit)
+
+    def _hydration_batch_size(self) -> int:
+        """
+        Users per nodes(ids:) request: as many as GitHub accepts, but no more
+        than the remaining budget (above the floor) can pay for at the cost
+        per user observed so far. 0 means hydration would dip below the floor.
+        """
+        if not self.last_rate_limit:
+            return self.hydrate_batch_size
+        spendable = (self.last_rate_limit.get('remaining') or 0) - self.rate_limit_floor
+        return max(0, min(self.hydrate_batch_size, int(spendable / self.points_per_user)))
+
+    async def _fetch_search_page(self, session, document, github_query_str: str, first: int,
+                                 cursor: Optional[str], tally: dict) -> dict:
+        with span("github_search", first=first):
+            result = await session.execute(
+                document,
+                variable_values={"query_str": github_query_str, "limit": first, "cursor": cursor},
+            )
+        self._record_rate_limit(result.get('rateLimit'), tally)
+        return result
+
+    async def _hydrate(self, session, ids: list[str], tally: dict) -> AsyncIterator[list[dict]]:
+        """Yields full profiles for node ids, in budget-sized nodes(ids:) batches."""
+        start = 0
+        while start < len(ids):
+            size = self._hydration_batch_size()
+            if size == 0:
+                print(f"Stopping hydration with {len(ids) - start} candidates left to preserve GitHub rate limit budget.")
+                return
+            chunk = ids[start:start + size]
+            start += size
+            with span("github_hydrate", users=len(chunk)):
+                result = await session.execute(HYDRATE_QUERY, variable_values={"ids": chunk})
+            rate_limit = result.get('rateLimit') or {}
+            self._record_rate_limit(rate_limit, tally)
+            # GitHub charges at least a point per request, so only full-ish batches say much about the per-user cost.
+            if rate_limit.get('cost') and len(chunk) >= MAX_NODES_PER_QUERY // 2:
+                self.points_per_user = (self.points_per_user + rate_limit['cost'] / len(chunk)) / 2
+            yield [parse_user_node(node) for node in result['nodes'] if node]
+
+    async def fetch_users(self, logins: list[str]) -> list[dict]:
+        """Fetches full candidate profiles for the given logins; unknown logins are skipped."""
+        session = await self.connect()
+        profiles = []
+        for start in range(0, len(logins), MAX_USERS_PER_QUERY):
+            chunk = logins[start:start + MAX_USERS_PER_QUERY]
+            with span("github_hydrate", users=len(chunk)):
+                try:
+                    result = await session.execute(
+                        users_query(len(chunk)),
+                        variable_values={f"login{i}": login for i, login in enumerate(chunk)},
+                    )
+                except TransportQueryError as e:
+                    # Renamed or deleted logins come back as null alongside NOT_FOUND errors.
+                    if not e.data:
+                        raise
+                    result = e.data
+            self._record_rate_limit(result.get('rateLimit'))
+            profiles.extend(parse_user_node(result[f"u{i}"]) for i in range(len(chunk)) if result.get(f"u{i}"))
+        return profiles
+
+    async def _iter_full_pages(self, session, github_query_str: str, limit: int, seen: set,
+                               tally: dict) -> AsyncIterator[list[dict]]:
+        """Single-phase search: every hit comes back with its full profile."""
+        fetched = 0
+        indexed = bool(seen)
+        next_page = asyncio.ensure_future(self._fetch_search_page(
+            session, SEARCH_QUERY, github_query_str, min(self.page_size, limit + len(seen)), None, tally
+        ))
+        try:
+            while next_page is not None:
+                result = await next_page
+                next_page = None
+                rate_limit = result.get('rateLimit') or {}
+
+                search = result['search']
+                page = [parse_user_node(node) for node in search['nodes'] if node]
+                if self.index is not None:
+                    await run_in_thread(self.index.upsert, page)
+                    if search.get('userCount') is not None:
+                        await run_in_thread(self.index.record_search, github_query_str, search['userCount'])
+                candidates = [dev for dev in page if dev["username"] not in seen][:limit - fetched]
+                seen.update(dev["username"] for dev in candidates)
+                fetched += len(candidates)
+
+                page_info = search.get('pageInfo') or {}
+                wanted = limit - fetched
+                if page_info.get('hasNextPage') and wanted > 0 and page:
+                    if self._can_afford_next_page(rate_limit):
+                        # Prefetch the next page before handing this one to the caller.
+                        # Pages are full-size once the index is involved, since some hits will be duplicates.
+                        first = self.page_size if indexed else min(self.page_size, wanted)
+                        next_page = asyncio.ensure_future(self._fetch_search_page(
+                            session, SEARCH_QUERY, github_query_str, first, page_info.get('endCursor'), tally
+                        ))
+                    else:
+                        print(f"Stopping pagination at {fetched} candidates to preserve GitHub rate limit budget.")
+
+                if candidates:
+                    yield candidates
+        finally:
+            if next_page is not None:
+                next_page.cancel()
+
+    async def _iter_two_phase_pages(self, session, github_query_str: str, limit: int, seen: set,
+                                    tally: dict, known: Optional[dict] = None) -> AsyncIterator[list[dict]]:
+        """
+        Two-phase search: pages of ids/logins only (one point each), then
+        full profiles for just the hits we keep. Hits found in `known` or
+        still fresh in the candidate index are taken from there instead of
+        being hydrated.
+        """
+        fetched = 0
+        next_page = asyncio.ensure_future(self._fetch_search_page(
+            session, LIGHT_SEARCH_QUERY, github_query_str, self.page_size, None, tally
+        ))
+        try:
+            while next_page is not None:
+                result = await next_page
+                next_page = None
+                search = result['search']
+                if self.index is not None and search.get('userCount') is not None:
+                    await run_in_thread(self.index.record_search, github_query_str, search['userCount'])
+
+                hits = [node for node in search['nodes'] if node and node.get('login') not in seen]
+                hits = hits[:limit - fetched]
+                seen.update(node['login'] for node in hits)
+
+                page_info = search.get('pageInfo') or {}
+                if page_info.get('hasNextPage') and fetched + len(hits) < limit and search['nodes']:
+                    if self._can_afford_next_page(result.get('rateLimit') or {}):
+                        # Prefetch the next light page while this one is hydrated.
+                        next_page = asyncio.ensure_future(self._fetch_search_page(
+                            session, LIGHT_SEARCH_QUERY, github_query_str, self.page_size, page_info.get('endCursor'), tally
+                        ))
+                    else:
+                        print(f"Stopping pagination at {fetched + len(hits)} candidates to preserve GitHub rate limit budget.")
+
+                cached = {node['login']: known[node['login']] for node in hits if node['login'] in known} if known else {}
+                unknown = [node['login'] for node in hits if node['login'] not in cached]
+                if self.index is not None and unknown:
+                    cached.update(await run_in_thread(self.index.get_fresh, unknown))
+                if cached:
+                    fetched += len(cached)
+                    yield list(cached.values())
+
+                ids = [node['id'] for node in hits if node['login'] not in cached]
+                async for profiles in self._hydrate(session, ids, tally):
+                    if self.index is not None:
+                        await run_in_thread(self.index.upsert, profiles)
+                    fetched += len(profiles)
+                    if profiles:
+                        yield profiles
+        finally:
+            if next_page is not None:
+                next_page.cancel()
+
+    async def iter_candidate_pages(self, query: str, limit: int = 10, known: Optional[dict] = None,
+                                   strict: bool = False) -> AsyncIterator[list[dict]]:
+        """
+        Yields pages of candidates for a search, up to `limit` in total.
+
+        Fresh matches from the local candidate index come first; GitHub is
+        only searched for the remainder, skipping profiles already yielded,
+        and everything it returns is added to the index.
+
+        With GITHUB_TWO_PHASE (the default), a search the index has partly
+        answered only asks GitHub for ids and logins, and full profiles are
+        fetched for the new hits alone (see _iter_two_phase_pages). `known`
+        (username -> profile, e.g. everything a batch run has fetched so far)
+        also selects that path, and its profiles are reused rather than
+        hydrated again. The next search page is requested as soon as the
+        current one arrives, as long as the reported rate limit budget stays
+        above GITHUB_RATE_LIMIT_FLOOR.
+
+        GitHub errors end the search with whatever was found so far, or are
+        re-raised when `strict` is set.
+        """
+        with span("query_parse"):
+            parsed_query = await parse_query_with_ai(query)
+        # The first parsed keyword narrows the search to bios that mention it. A failed
+        # parse returns the raw query words as keywords, which would only add noise.
+        keywords = [] if parsed_query.get('error') else parsed_query.get('keywords') or []
+        primary_keyword = keywords[0] if keywords else None
         github_query_str = self._build_graphql_search_query(
             language=parsed_query.get('language'),
             role=parsed_query.get('role'),
-            primary_keyword=parsed_query.get('primary_keyword')
+            primary_keyword=primary_keyword
         )
-        print(f"Executing GitHub GraphQL search with query: '{github_query_str}'")
-
-        graphql_query = gql("""
-            query search($query_str: String!, $limit: Int!) {
-              rateLimit {
-                limit
-                cost
-                remaining
-                resetAt
-              }
-              search(query: $query_str, type: USER, first: $limit) {
-                nodes {
-                  ... on User {
-                    login
-                    name
-                    bio
-                    avatarUrl
-                    url
-                    followers {
-                      totalCount
-                    }
-                    following {
-                      totalCount
-                    }
-                    repositories(first: 5, orderBy: {field: STARGAZERS, direction: DESC}) {
-                      totalCount
-                      nodes {
-                        name
-                        stargazerCount
-                        forkCount
-                        description
-                        primaryLanguage {
-                          name
-                        }
-                      }
-                    }
-                    contributionsCollection {
-                      contributionCalendar {
-                        totalContributions
-                      }
-                    }
-                  }
-                }
-              }
-            }
-        """)
+        limit = max(0, min(limit, self.max_candidates))
+
+        indexed = []
+        if self.index is not None:
+            indexed = await run_in_thread(
+                self.index.search, parsed_query.get('language'), parsed_query.get('role'), primary_keyword, limit,
+            )
+            CANDIDATE_SOURCES.labels("index").inc(len(indexed))
+            if indexed:
+                yield indexed
+            known_total = await run_in_thread(self.index.known_user_count, github_query_str)
+            if len(indexed) >= limit or (known_total is not None and len(indexed) >= known_total):
+                logger.info(f"Served all {len(indexed)} candidates from the local index.")
+                return
+
+        seen = {dev["username"] for dev in indexed}
+        tally = {"points": 0}
+        print(f"Executing GitHub GraphQL search with query: '{github_query_str}' (up to {limit - len(indexed)} candidates)")
 
         try:
-            async with self.client as session:
-                result = await session.execute(graphql_query, variable_values={"query_str": github_query_str, "limit": limit})
-            
-            print(f"GitHub API Rate Limit: {result['rateLimit']}")
-
-            candidates = []
-            for user_node in result['search']['nodes']:
-                if not user_node: continue
-
-                top_repos = []
-                # Gracefully handle cases where repositories or their nodes are None
-                for repo in (user_node.get('repositories') or {}).get('nodes') or []:
-                    if not repo: continue
-                    top_repos.append({
-                        "name": repo.get('name'),
-                        "stargazers_count": repo.get('stargazerCount'),
-                        "forks_count": repo.get('forkCount'),
-                        "description": repo.get('description'),
-                        "language": (repo.get('primaryLanguage') or {}).get('name')
-                    })
-
-                # Safely access nested fields
-                followers_count = (user_node.get('followers') or {}).get('totalCount')
-                following_count = (user_node.get('following') or {}).get('totalCount')
-                public_repos_count = (user_node.get('repositories') or {}).get('totalCount')
-                total_contributions = (user_node.get('contributionsCollection') or {}).get('contributionCalendar', {}).get('totalContributions', 0)
-
-                dev_details = {
-                    "username": user_node.get('login'),
-                    "name": user_node.get('name'),
-                    "bio": user_node.get('bio'),
-                    "avatar_url": user_node.get('avatarUrl'),
-                    "html_url": user_node.get('url'),
-                    "followers": followers_count,
-                    "following": following_count,
-                    "public_repos": public_repos_count,
-                    "total_contributions": total_contributions,
-                    "top_repositories": top_repos
-                }
-                candidates.append(dev_details)
-            
-            return candidates
+            session = await self.connect()
+            # The light search only pays for itself when some hits are likely known already:
+            # on a cold search every hit gets hydrated anyway, on top of the extra search page.
+            if self.two_phase and (seen or known):
+                pages = self._iter_two_phase_pages(session, github_query_str, limit - len(indexed), seen, tally, known)
+            else:
+                pages = self._iter_full_pages(session, github_query_str, limit - len(indexed), seen, tally)
+            try:
+                async for page in pages:
+                    CANDIDATE_SOURCES.labels("github").inc(len(page))
+                    yield page
+            finally:
+                await pages.aclose()
         except Exception as e:
             print(f"Error executing GraphQL query for '{query}': {e}")
             # Check for common rate limit error message
             if 'rate limit' in str(e).lower():
                 print("You may have hit the GitHub API rate limit. Check your token and usage.")
-            return []
+            if strict:
+                raise
+        finally:
+            self.search_count += 1
+            self.search_points += tally["points"]
+            GITHUB_POINTS_PER_SEARCH.observe(tally["points"])
+            logger.info(f"GitHub search for '{query}' spent {tally['points']} rate limit points.")
+
+    def stats(self) -> dict:
+        return {
+            "two_phase": self.two_phase,
+            "searches": self.search_count,
+            "points": self.search_points,
+            "points_per_search": self.search_points / self.search_count if self.search_count else 0.0,
+            "hydration_points_per_user": self.points_per_user,
+            "rate_limit": self.last_rate_limit,
+        }
+
+    async def find_cracked_developers(self, query: str, limit: int = 10, strict: bool = False) -> list[dict]:
+        """Finds developers by collecting every page of the paginated search."""
+        candidates = []
+        async for page in self.iter_candidate_pages(query, limit=limit, strict=strict):
+            candidates.extend(page)
+        return candidates
 
 async def main():
-    # Example usage for testing
+    # Example usage for testing. Pass --cache-schema to write the SDL file instead.
+    import sys
     client = GitHubClient()
-    devs = await client.find_cracked_developers("cracked rust engineer", limit=5)
+    if "--cache-schema" in sys.argv:
+        await client.cache_schema()
+        return
+    try:
+        devs = await client.find_cracked_developers("cracked rust engineer", limit=5)
+    finally:
+        await client.close()
     import json
     print(json.dumps(devs, indent=2))
 
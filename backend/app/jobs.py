@@ -0,0 +1,267 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import asyncio
+import logging
+import threading
+from typing import Optional
+
+from .github_client import GitHubClient
+from .ranking import DeveloperRanker
+from .compute import dumps, run_in_thread
+
+logger = logging.getLogger(__name__)
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+# Partial results are written in chunks rather than one transaction per developer.
+FLUSH_EVERY = 25
+
+class JobStore:
+    """
+    SQLite store for search jobs and their ranked results.
+
+    Results are written as ratings land, so a running job can already be
+    paged through (ordered by ensemble score), and are rewritten in final
+    rank order when the job finishes.
+    """
+
+    def __init__(self, path: str):
+        self.path = path or ":memory:"
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, query TEXT NOT NULL, search_limit INTEGER NOT NULL, top_k INTEGER, "
+            "status TEXT NOT NULL, created_at REAL NOT NULL, started_at REAL, finished_at REAL, "
+            "candidates INTEGER, rated INTEGER NOT NULL DEFAULT 0, error TEXT)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs(status, created_at)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS job_results ("
+            "job_id TEXT NOT NULL, position INTEGER NOT NULL, ensemble_score REAL NOT NULL, developer TEXT NOT NULL, "
+            "PRIMARY KEY (job_id, position))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS job_results_score ON job_results(job_id, ensemble_score DESC, position)")
+        self._conn.commit()
+
+    def create(self, query: str, limit: int, top_k: Optional[int]) -> dict:
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, query, search_limit, top_k, status, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, query, limit, top_k, QUEUED, time.time()),
+            )
+            self._conn.commit()
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            results = self._conn.execute("SELECT COUNT(*) FROM job_results WHERE job_id = ?", (job_id,)).fetchone()[0]
+        job = dict(row)
+        job["limit"] = job.pop("search_limit")
+        job["results"] = results
+        return job
+
+    def mark_running(self, job_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM job_results WHERE job_id = ?", (job_id,))
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, started_at = ?, rated = 0, candidates = NULL, error = NULL WHERE id = ?",
+                (RUNNING, time.time(), job_id),
+            )
+            self._conn.commit()
+
+    def set_candidates(self, job_id: str, candidates: int):
+        with self._lock:
+            self._conn.execute("UPDATE jobs SET candidates = ? WHERE id = ?", (candidates, job_id))
+            self._conn.commit()
+
+    def add_results(self, job_id: str, rows: list[tuple[int, float, str]], rated: int):
+        """Appends (position, ensemble score, developer JSON) rows and updates progress."""
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO job_results (job_id, position, ensemble_score, developer) VALUES (?, ?, ?, ?)",
+                [(job_id, *row) for row in rows],
+            )
+            self._conn.execute("UPDATE jobs SET rated = ? WHERE id = ?", (rated, job_id))
+            self._conn.commit()
+
+    def finish(self, job_id: str, rows: list[tuple[int, float, str]], rated: int):
+        """Replaces the partial results with the final ranking and marks the job done."""
+        with self._lock:
+            self._conn.execute("DELETE FROM job_results WHERE job_id = ?", (job_id,))
+            self._conn.executemany(
+                "INSERT INTO job_results (job_id, position, ensemble_score, developer) VALUES (?, ?, ?, ?)",
+                [(job_id, *row) for row in rows],
+            )
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, rated = ? WHERE id = ?",
+                (DONE, time.time(), rated, job_id),
+            )
+            self._conn.commit()
+
+    def fail(self, job_id: str, error: str):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, error = ? WHERE id = ?",
+                (FAILED, time.time(), error, job_id),
+            )
+            self._conn.commit()
+
+    def results(self, job_id: str, offset: int, page_size: int) -> list[dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT developer FROM job_results WHERE job_id = ? "
+                "ORDER BY ensemble_score DESC, position LIMIT ? OFFSET ?",
+                (job_id, page_size, offset),
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def requeue_interrupted(self) -> list[str]:
+        """Puts jobs left running by a previous process back in the queue; returns all queued ids."""
+        with self._lock:
+            self._conn.execute("UPDATE jobs SET status = ?, started_at = NULL WHERE status = ?", (QUEUED, RUNNING))
+            self._conn.commit()
+            rows = self._conn.execute("SELECT id FROM jobs WHERE status = ? ORDER BY created_at", (QUEUED,)).fetchall()
+        return [row[0] for row in rows]
+
+    def purge(self, max_age_seconds: float) -> int:
+        """Deletes finished jobs (and their results) older than max_age_seconds."""
+        cutoff = time.time() - max_age_seconds
+        with self._lock:
+            expired = "SELECT id FROM jobs WHERE status IN (?, ?) AND finished_at < ?"
+            self._conn.execute(f"DELETE FROM job_results WHERE job_id IN ({expired})", (DONE, FAILED, cutoff))
+            deleted = self._conn.execute("DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ?", (DONE, FAILED, cutoff)).rowcount
+            self._conn.commit()
+        return deleted
+
+    def counts(self) -> dict:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        counts = {status: 0 for status in (QUEUED, RUNNING, DONE, FAILED)}
+        counts.update({row[0]: row[1] for row in rows})
+        return counts
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+def _result_row(position: int, developer) -> tuple[int, float, str]:
+    return position, developer.ensemble_score, dumps(developer.model_dump()).decode()
+
+def _result_rows(entries: list[tuple[int, object]]) -> list[tuple[int, float, str]]:
+    return [_result_row(position, developer) for position, developer in entries]
+
+class JobManager:
+    """
+    Runs queued search jobs on a bounded pool of worker tasks.
+
+    Jobs are persisted before they are queued, so a restart re-enqueues
+    anything that was queued or still running; finished results are read
+    straight from the store. Store calls (and serializing results for it)
+    run in the compute thread pool, off the event loop.
+    """
+
+    def __init__(self, store: JobStore, github_client: GitHubClient, ranker: DeveloperRanker,
+                 workers: int, retention_seconds: float):
+        self.store = store
+        self.github_client = github_client
+        self.ranker = ranker
+        self.workers = max(1, workers)
+        self.retention_seconds = retention_seconds
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: list[asyncio.Task] = []
+
+    @classmethod
+    def from_env(cls, github_client: GitHubClient, ranker: DeveloperRanker) -> "JobManager":
+        return cls(
+            JobStore(os.getenv("CRAKD_JOB_STORE_PATH", "crakd_jobs.db")),
+            github_client,
+            ranker,
+            workers=int(os.getenv("CRAKD_JOB_WORKERS", "2")),
+            retention_seconds=float(os.getenv("CRAKD_JOB_RETENTION", str(7 * 24 * 3600))),
+        )
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        purged = await run_in_thread(self.store.purge, self.retention_seconds)
+        pending = await run_in_thread(self.store.requeue_interrupted)
+        for job_id in pending:
+            self._queue.put_nowait(job_id)
+        self._tasks = [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+        logger.info(f"Job workers started ({self.workers}); {len(pending)} jobs re-enqueued, {purged} expired jobs purged.")
+
+    async def stop(self):
+        # Jobs interrupted here stay 'running' in the store and are re-enqueued by the next start().
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, query: str, limit: int, top_k: Optional[int] = None) -> dict:
+        job = await run_in_thread(self.store.create, query, limit, top_k)
+        self._queue.put_nowait(job["id"])
+        return job
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._execute(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job {job_id} failed: {e}")
+                await run_in_thread(self.store.fail, job_id, str(e))
+            finally:
+                self._queue.task_done()
+
+    def _flush(self, job_id: str, entries: list, rated: int):
+        self.store.add_results(job_id, _result_rows(entries), rated)
+
+    def _finish(self, job_id: str, ranked: list, rated: int):
+        self.store.finish(job_id, _result_rows(list(enumerate(ranked))), rated)
+
+    async def _execute(self, job_id: str):
+        job = await run_in_thread(self.store.get, job_id)
+        if job is None or job["status"] not in (QUEUED, RUNNING):
+            return
+        await run_in_thread(self.store.mark_running, job_id)
+        logger.info(f"Job {job_id}: running '{job['query']}' (limit {job['limit']}, top_k {job['top_k']}).")
+
+        # A failed GitHub search fails the job instead of finishing it with no candidates.
+        developers = await self.github_client.find_cracked_developers(job["query"], limit=job["limit"], strict=True)
+        await run_in_thread(self.store.set_candidates, job_id, len(developers))
+
+        ranked = []
+        pending = []
+        rated_count = 0
+        rated = self.ranker.iter_rated_developers(developers, job["query"], top_k=job["top_k"])
+        try:
+            async for dev, rank, rated_count in rated:
+                ranked.insert(rank, dev)
+                pending.append((rated_count, dev))
+                if len(pending) >= FLUSH_EVERY:
+                    await run_in_thread(self._flush, job_id, pending, rated_count)
+                    pending = []
+        finally:
+            await rated.aclose()
+
+        ranked = ranked[:job["top_k"]]
+        await run_in_thread(self._finish, job_id, ranked, rated_count)
+        logger.info(f"Job {job_id}: done, {len(ranked)} ranked developers.")
+
+    async def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "queued_in_memory": self._queue.qsize() if self._queue is not None else 0,
+            **await run_in_thread(self.store.counts),
+        }
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional
 
 class Repository(BaseModel):
@@ -20,3 +20,8 @@ class Developer(BaseModel):
     github_score: Optional[float] = None # Score from quantitative metrics
     ensemble_score: Optional[float] = None # Combined score
     reasoning: Optional[str] = None
+
+class JobRequest(BaseModel):
+    query: str
+    limit: int = Field(50, ge=1, le=1000)
+    top_k: Optional[int] = Field(None, ge=1)
@@ -0,0 +1,197 @@
+import os
+import re
+import time
+import logging
+from typing import Optional
+
+from .cache import QUERY_STOPWORDS, LRUCache, SQLiteCache, normalize_query
+from .xai_client import get_xai_client
+from .compute import run_in_thread
+
+logger = logging.getLogger(__name__)
+
+# Aliases mapped to the language name GitHub's `language:` qualifier expects.
+LANGUAGES = {
+    "python": "python", "py": "python", "python3": "python",
+    "rust": "rust", "rustacean": "rust",
+    "go": "go", "golang": "go",
+    "typescript": "typescript", "ts": "typescript",
+    "javascript": "javascript", "js": "javascript", "node": "javascript", "nodejs": "javascript", "node.js": "javascript",
+    "java": "java", "kotlin": "kotlin", "swift": "swift", "scala": "scala",
+    "c++": "c++", "cpp": "c++", "c": "c", "c#": "c#", "csharp": "c#",
+    "ruby": "ruby", "php": "php", "haskell": "haskell", "elixir": "elixir",
+    "erlang": "erlang", "zig": "zig", "julia": "julia", "dart": "dart",
+    "lua": "lua", "ocaml": "ocaml", "clojure": "clojure", "solidity": "solidity",
+    "nim": "nim", "perl": "perl", "cuda": "cuda", "verilog": "verilog",
+}
+
+# Frameworks imply a language and are kept as keywords.
+FRAMEWORKS = {
+    "react": "javascript", "react native": "javascript", "nextjs": "typescript", "next.js": "typescript",
+    "vue": "javascript", "svelte": "javascript", "angular": "typescript",
+    "django": "python", "flask": "python", "fastapi": "python", "pytorch": "python",
+    "tensorflow": "python", "jax": "python", "rails": "ruby", "ruby on rails": "ruby",
+    "laravel": "php", "spring": "java", "flutter": "dart", "tokio": "rust", "swiftui": "swift",
+}
+
+ROLES = {
+    "engineer": "engineer", "engineers": "engineer", "swe": "engineer",
+    "developer": "developer", "developers": "developer", "dev": "developer", "devs": "developer",
+    "programmer": "programmer", "programmers": "programmer", "coder": "programmer", "coders": "programmer",
+    "architect": "architect", "architects": "architect",
+    "researcher": "researcher", "researchers": "researcher",
+    "scientist": "scientist", "scientists": "scientist",
+    "maintainer": "maintainer", "maintainers": "maintainer",
+    "hacker": "hacker", "hackers": "hacker",
+    "designer": "designer", "designers": "designer",
+    "sre": "sre", "devops": "devops",
+}
+
+KEYWORDS = {
+    "machine learning", "deep learning", "distributed systems", "full stack", "fullstack",
+    "computer vision", "reinforcement learning", "smart contracts", "game engine",
+    "ml", "ai", "llm", "llms", "nlp", "web3", "blockchain", "crypto", "compilers", "compiler",
+    "kernel", "embedded", "backend", "frontend", "infra", "infrastructure", "databases",
+    "database", "security", "cryptography", "graphics", "gamedev", "robotics", "kubernetes",
+    "cloud", "mobile", "ios", "android", "web", "systems", "performance", "open source",
+    "senior", "staff", "principal", "junior", "founding", "startup",
+}
+
+# Aliases that are also everyday words ("go find", "plan c"). They only count as a
+# language next to a role or keyword ("go developer", "c embedded") or after one of
+# LANGUAGE_CUES ("experienced in go"); anywhere else the query goes to the LLM parser.
+AMBIGUOUS_LANGUAGES = {"go", "c"}
+LANGUAGE_CUES = {"in", "know", "knows"}
+
+MAX_PHRASE_WORDS = 3
+
+def _is_language_in_context(tokens: list[str], i: int) -> bool:
+    if tokens[i] not in AMBIGUOUS_LANGUAGES:
+        return True
+    following = tokens[i + 1] if i + 1 < len(tokens) else None
+    preceding = tokens[i - 1] if i > 0 else None
+    return following in ROLES or following in KEYWORDS or preceding in LANGUAGE_CUES
+
+def parse_query_locally(query: str) -> Optional[dict]:
+    """
+    Parses a query with the built-in lexicon.
+
+    Returns None when any word is unrecognized, so the caller can fall back
+    to the LLM parser instead of guessing.
+    """
+    tokens = re.findall(r"[a-z0-9+#.]+", query.lower())
+    tokens = [t.rstrip(".") or t for t in tokens]
+    language, role, keywords = None, None, []
+    i = 0
+    while i < len(tokens):
+        # Prefer the longest multi-word phrase starting at this token.
+        for size in range(min(MAX_PHRASE_WORDS, len(tokens) - i), 0, -1):
+            phrase = " ".join(tokens[i:i + size])
+            if phrase in FRAMEWORKS:
+                language = language or FRAMEWORKS[phrase]
+                keywords.append(phrase)
+            elif phrase in KEYWORDS:
+                keywords.append(phrase)
+            elif size == 1 and phrase in LANGUAGES:
+                if not _is_language_in_context(tokens, i):
+                    return None
+                language = language or LANGUAGES[phrase]
+            elif size == 1 and phrase in ROLES:
+                role = role or ROLES[phrase]
+            elif size == 1 and phrase in QUERY_STOPWORDS:
+                pass
+            else:
+                continue
+            i += size
+            break
+        else:
+            return None
+    return {"language": language, "role": role, "keywords": keywords}
+
+def query_terms(query: str) -> list[str]:
+    """
+    The words of a query worth matching against a profile: filler and role
+    words are dropped and language aliases map to their GitHub names.
+    """
+    terms = []
+    for token in re.findall(r"[a-z0-9+#.]+", query.lower()):
+        token = token.rstrip(".") or token
+        if token in QUERY_STOPWORDS or token in ROLES:
+            continue
+        term = LANGUAGES.get(token, token)
+        if term not in terms:
+            terms.append(term)
+    return terms
+
+class QueryParser:
+    """
+    Parses queries via a local lexicon fast path, a memoized cache, and the
+    Grok parser as a last resort. Tracks how often each path is taken.
+    """
+
+    SOURCES = ("local", "cache", "llm")
+
+    def __init__(self, path: Optional[str], max_memory_entries: int, ttl_seconds: float, max_disk_entries: int):
+        self.memory = LRUCache(max_memory_entries)
+        self.disk = SQLiteCache(path, "parsed_queries", ttl_seconds, max_disk_entries) if path else None
+        self.counts = {source: 0 for source in self.SOURCES}
+        self.seconds = {source: 0.0 for source in self.SOURCES}
+
+    @classmethod
+    def from_env(cls) -> "QueryParser":
+        return cls(
+            path=os.getenv("CRAKD_CACHE_PATH", "crakd_cache.db"),
+            max_memory_entries=int(os.getenv("CRAKD_QUERY_CACHE_MEMORY_SIZE", "10000")),
+            ttl_seconds=float(os.getenv("CRAKD_QUERY_CACHE_TTL", str(30 * 24 * 3600))),
+            max_disk_entries=int(os.getenv("CRAKD_QUERY_CACHE_MAX_ROWS", "100000")),
+        )
+
+    def _record(self, source: str, started_at: float):
+        self.counts[source] += 1
+        self.seconds[source] += time.perf_counter() - started_at
+
+    async def parse(self, query: str) -> dict:
+        started_at = time.perf_counter()
+
+        parsed = parse_query_locally(query)
+        if parsed is not None:
+            self._record("local", started_at)
+            return parsed
+
+        key = normalize_query(query)
+        parsed = self.memory.get(key)
+        if parsed is None and self.disk is not None:
+            parsed = await run_in_thread(self.disk.get, key)
+            if parsed is not None:
+                self.memory.set(key, parsed)
+        if parsed is not None:
+            self._record("cache", started_at)
+            return dict(parsed)
+
+        parsed = await get_xai_client().parse_query(query)
+        self._record("llm", started_at)
+        if not parsed.get("error"):
+            self.memory.set(key, parsed)
+            if self.disk is not None:
+                await run_in_thread(self.disk.set, key, parsed)
+        return parsed
+
+    def stats(self) -> dict:
+        total = sum(self.counts.values())
+        return {
+            "counts": dict(self.counts),
+            "avg_ms": {
+                source: (self.seconds[source] / self.counts[source]) * 1000 if self.counts[source] else 0.0
+                for source in self.SOURCES
+            },
+            "fast_path_rate": (self.counts["local"] + self.counts["cache"]) / total if total else 0.0,
+        }
+
+_query_parser: Optional[QueryParser] = None
+
+def get_query_parser() -> QueryParser:
+    """Returns the process-wide query parser."""
+    global _query_parser
+    if _query_parser is None:
+        _query_parser = QueryParser.from_env()
+    return _query_parser
@@ -1,73 +1,273 @@
 from .models import Developer
-from .xai_client import XAIClient
-from .analysis import engineer_features
+from .xai_client import get_xai_client
+from .cache import get_rating_cache
+from .telemetry import CASCADE_CANDIDATES, span
+from .compute import run_in_thread
+from .features import CandidateStore, ReferenceDistribution, lexical_scores, parse_weights, score_features
+from .query_parser import query_terms
 import numpy as np
+import os
+import bisect
 import logging
 import asyncio
-from typing import Callable, Optional
+from collections import Counter, deque
+from typing import AsyncIterator, Callable, Optional
 
 logger = logging.getLogger(__name__)
 
+# Ensemble: 60% Grok, 40% GitHub Score
+GROK_WEIGHT = 0.6
+GITHUB_WEIGHT = 0.4
+
 class DeveloperRanker:
-    def __init__(self):
-        self.xai_client = XAIClient()
+    def __init__(self, batch_size: Optional[int] = None):
+        self.xai_client = get_xai_client()
+        # Number of developers scored per Grok completion (1 = one call per developer).
+        self.batch_size = batch_size or int(os.getenv("XAI_RATING_BATCH_SIZE", "5"))
+        self.rating_cache = get_rating_cache()
+        # How raw GitHub features are normalized into github_score (see features.score_features).
+        self.normalization = os.getenv("CRAKD_SCORE_NORMALIZATION", "sum_max")
+        self.weights = parse_weights(os.getenv("CRAKD_SCORE_WEIGHTS"))
+        self.reference = ReferenceDistribution.load(os.getenv("CRAKD_REFERENCE_PATH", "reference_distribution.npy"))
+        # Cascade mode (top_k): the highest Grok score assumed possible for a candidate whose
+        # profile mentions none of the query terms. 100 keeps the cascade exact.
+        self.mismatch_ceiling = float(os.getenv("CRAKD_CASCADE_MISMATCH_CEILING", "100"))
+        # Grok batches kept in flight at once by the cascade.
+        self.cascade_parallelism = int(os.getenv("CRAKD_CASCADE_PARALLEL_BATCHES", "4"))
+        self.cascade_counts = Counter()
+
+    async def rate_with_cache(self, developers: list[dict], query: str) -> list[dict]:
+        """Rates developers, serving cached ratings and only sending misses to Grok."""
+        ratings = await run_in_thread(self.rating_cache.get_many, query, developers)
+        misses = [i for i, rating in enumerate(ratings) if rating is None]
+        logger.info(f"Rating cache: {len(developers) - len(misses)} hits, {len(misses)} misses.")
+        if misses:
+            logger.info(f"Rating {len(misses)} developers with Grok (batch size {self.batch_size})...")
+            fresh = await self.xai_client.rate_developers([developers[i] for i in misses], query, batch_size=self.batch_size)
+            await run_in_thread(self.rating_cache.set_many, query, [developers[i] for i in misses], fresh)
+            for i, rating in zip(misses, fresh):
+                ratings[i] = rating
+        return ratings
 
-    async def rank_developers(self, developers: list[dict], query: str) -> list[Developer]:
+    async def rank_developers(self, developers: list[dict], query: str, top_k: Optional[int] = None) -> list[Developer]:
         """Original method for backwards compatibility."""
-        return await self.rank_developers_with_progress(developers, query, progress_callback=None)
+        return await self.rank_developers_with_progress(developers, query, progress_callback=None, top_k=top_k)
 
     async def rank_developers_with_progress(
         self,
         developers: list[dict],
         query: str,
-        progress_callback: Optional[Callable[[str], None]] = None
+        progress_callback: Optional[Callable[[str], None]] = None,
+        top_k: Optional[int] = None,
     ) -> list[Developer]:
         if not developers:
             return []
 
-        # 1. Get qualitative ratings from Grok concurrently
-        tasks = []
-        for dev_data in developers:
-            logger.info(f"Rating developer '{dev_data.get('username')}' with Grok...")
-            tasks.append(self.xai_client.rate_developer(dev_data, query))
-
-        ratings = await asyncio.gather(*tasks)
-
-        rated_developers = []
-        for i, dev_data in enumerate(developers):
-            rating = ratings[i]
-            dev = Developer(
-                username=dev_data.get("username"),
-                name=dev_data.get("name"),
-                bio=dev_data.get("bio"),
-                followers=dev_data.get("followers"),
-                following=dev_data.get("following"),
-                public_repos=dev_data.get("public_repos"),
-                repositories=dev_data.get("top_repositories", []),
-                cracked_score=rating.get("cracked_score", 0),
-                reasoning=rating.get("reasoning", "")
-            )
-            rated_developers.append(dev)
-
-        # 2. Calculate quantitative GitHub score
-        features = engineer_features(developers)
-        feature_sums = np.sum(features, axis=1)
-        max_score = np.max(feature_sums)
-        if max_score > 0:
-            github_scores = (feature_sums / max_score) * 100
-        else:
-            github_scores = np.zeros(len(developers))
-
-        # 3. Calculate ensemble score and update models
-        for i, dev in enumerate(rated_developers):
-            dev.github_score = github_scores[i]
-
-            # Ensemble: 60% Grok, 40% GitHub Score
-            dev.ensemble_score = (0.6 * dev.cracked_score) + (0.4 * dev.github_score)
-            logger.debug(f"Scores for {dev.username}: Grok={dev.cracked_score}, GitHub={dev.github_score}, Ensemble={dev.ensemble_score}")
-
-        # 4. Sort developers by the final ensemble score
-        rated_developers.sort(key=lambda dev: dev.ensemble_score, reverse=True)
+        # Ratings arrive as they complete; the final order is the same as scoring them all at once.
+        ranked = []
+        async for dev, rank, rated_count in self.iter_rated_developers(developers, query, top_k=top_k):
+            ranked.insert(rank, dev)
+            if progress_callback:
+                progress_callback(f"rated {dev.username} ({rated_count}/{len(developers)})")
+        logger.info("Finished ranking developers by ensemble score.")
+        return ranked[:top_k]
+
+    def cascade_upper_bounds(self, developers: list[dict], query: str, github_scores: np.ndarray) -> np.ndarray:
+        """
+        Best ensemble score each candidate could still reach before Grok sees it.
+
+        The GitHub component is already known; the Grok component is assumed
+        to max out at 100, or at mismatch_ceiling for profiles that share no
+        terms with the query.
+        """
+        lexical = lexical_scores(developers, query_terms(query))
+        ceilings = np.where(lexical > 0, 100.0, self.mismatch_ceiling)
+        return GROK_WEIGHT * ceilings + GITHUB_WEIGHT * github_scores
+
+    async def start_rating(self, developers: list[dict], query: str, offset: int = 0,
+                           ) -> tuple[dict[int, dict], dict[asyncio.Future, list[int]]]:
+        """
+        Looks `developers` up in the rating cache and sends the misses to Grok
+        in batches without waiting for them. Returns the cached ratings and the
+        in-flight batches keyed by task, both by index shifted by `offset`, for
+        iter_rated_developers(cached=..., in_flight=...).
+        """
+        ratings = await run_in_thread(self.rating_cache.get_many, query, developers)
+        cached = {offset + i: rating for i, rating in enumerate(ratings) if rating is not None}
+        misses = [i for i, rating in enumerate(ratings) if rating is None]
+        in_flight = {}
+        for start in range(0, len(misses), self.batch_size):
+            batch = misses[start:start + self.batch_size]
+            task = asyncio.ensure_future(self._rate_batch([developers[i] for i in batch], query))
+            in_flight[task] = [offset + i for i in batch]
+        return cached, in_flight
+
+    async def iter_rated_developers(self, developers: list[dict], query: str, top_k: Optional[int] = None,
+                                    cached: Optional[dict[int, dict]] = None,
+                                    in_flight: Optional[dict[asyncio.Future, list[int]]] = None,
+                                    ) -> AsyncIterator[tuple[Developer, int, int]]:
+        """
+        Yields (developer, provisional rank, rated count) as each rating lands.
+
+        Cached ratings are yielded first, then Grok batches in completion order.
+        Outstanding Grok calls are cancelled if the consumer stops iterating.
+        `cached` and `in_flight` take what start_rating already found and
+        started (e.g. while later search pages were still being fetched);
+        those developers aren't looked up or rated again.
+
+        With top_k the misses are rated as a cascade: highest upper bound
+        first, a few batches at a time, and once K developers are rated, any
+        candidate whose upper bound is below the K-th best ensemble score is
+        never sent to Grok. Those candidates cannot make the top K, so the top
+        K matches the full pipeline (as long as mismatch_ceiling is 100).
+        """
+        pending = dict(in_flight or {})
+        try:
+            if not developers:
+                return
+
+            # Feature engineering and scoring run in the compute pool, off the event loop.
+            github_scores = await run_in_thread(self.github_scores, developers)
+            # (negated ensemble score, input index) of everything yielded so far, kept
+            # sorted for bisect; the index breaks ties like the stable sort in score_and_sort.
+            ranked_keys = []
+
+            def place(i: int, rating: dict) -> tuple[Developer, int, int]:
+                with span("ensemble_scoring", developers=1):
+                    dev = self.build_developer(developers[i], rating, github_scores[i])
+                    key = (-dev.ensemble_score, i)
+                    rank = bisect.bisect_left(ranked_keys, key)
+                    ranked_keys.insert(rank, key)
+                return dev, rank, len(ranked_keys)
+
+            # 1. Serve cached ratings immediately
+            hits = dict(cached or {})
+            started = {i for batch in pending.values() for i in batch}
+            remaining = [i for i in range(len(developers)) if i not in hits and i not in started]
+            if remaining:
+                ratings = await run_in_thread(self.rating_cache.get_many, query, [developers[i] for i in remaining])
+                hits.update((i, rating) for i, rating in zip(remaining, ratings) if rating is not None)
+            misses = [i for i in remaining if i not in hits]
+            for i, rating in sorted(hits.items()):
+                yield place(i, rating)
+            logger.info(f"Rating cache: {len(hits)} hits, {len(misses) + len(started)} misses.")
+
+            # 2. Fan out the misses to Grok in batches and yield in completion order
+            if top_k is None:
+                upper_bounds = None
+                queue = deque(misses)
+                parallelism = len(misses)
+            else:
+                upper_bounds = await run_in_thread(self.cascade_upper_bounds, developers, query, github_scores)
+                queue = deque(sorted(misses, key=lambda i: (-upper_bounds[i], i)))
+                parallelism = max(1, self.cascade_parallelism)
+
+            def next_batch() -> list[int]:
+                if upper_bounds is not None and queue and len(ranked_keys) >= top_k:
+                    # The queue is sorted by upper bound, so everything from here on is out of reach.
+                    kth_best = -ranked_keys[top_k - 1][0]
+                    if upper_bounds[queue[0]] < kth_best:
+                        queue.clear()
+                return [queue.popleft() for _ in range(min(self.batch_size, len(queue)))]
+
+            while True:
+                while queue and len(pending) < parallelism:
+                    batch = next_batch()
+                    if batch:
+                        pending[asyncio.ensure_future(self._rate_batch([developers[i] for i in batch], query))] = batch
+                if not pending:
+                    break
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    batch = pending.pop(task)
+                    for i, rating in zip(batch, task.result()):
+                        yield place(i, rating)
+        finally:
+            for task in pending:
+                task.cancel()
+
+        if top_k is not None:
+            sent = len(misses) + len(started)
+            pruned = len(developers) - len(ranked_keys)
+            self._record_cascade(len(developers), len(developers) - sent, sent - pruned, pruned)
+
+    def _record_cascade(self, candidates: int, cached: int, rated: int, pruned: int):
+        self.cascade_counts.update(searches=1, candidates=candidates, cached=cached, rated=rated, pruned=pruned)
+        CASCADE_CANDIDATES.labels("cached").inc(cached)
+        CASCADE_CANDIDATES.labels("rated").inc(rated)
+        CASCADE_CANDIDATES.labels("pruned").inc(pruned)
+        logger.info(f"Cascade: {candidates} candidates, {cached} cached, {rated} sent to Grok, "
+                    f"{pruned} pruned ({pruned / candidates:.0%}).")
+
+    def cascade_stats(self) -> dict:
+        candidates = self.cascade_counts["candidates"]
+        return {
+            "searches": self.cascade_counts["searches"],
+            "candidates": candidates,
+            "cached": self.cascade_counts["cached"],
+            "rated": self.cascade_counts["rated"],
+            "pruned": self.cascade_counts["pruned"],
+            "pruning_rate": self.cascade_counts["pruned"] / candidates if candidates else 0.0,
+        }
+
+    async def _rate_batch(self, developers: list[dict], query: str) -> list[dict]:
+        ratings = await self.xai_client.rate_developers_batch(developers, query)
+        await run_in_thread(self.rating_cache.set_many, query, developers, ratings)
+        return ratings
+
+    async def rank_candidate_pages(self, pages: AsyncIterator[list[dict]], query: str) -> list[Developer]:
+        """Ranks candidates from a paginated search, rating each page as soon as it arrives."""
+        developers = []
+        rating_tasks = []
+        try:
+            async for page in pages:
+                developers.extend(page)
+                rating_tasks.append(asyncio.ensure_future(self.rate_with_cache(page, query)))
+            page_ratings = await asyncio.gather(*rating_tasks)
+        except BaseException:
+            for task in rating_tasks:
+                task.cancel()
+            raise
+
+        if not developers:
+            return []
+        ratings = [rating for page in page_ratings for rating in page]
+        return await run_in_thread(self.score_and_sort, developers, ratings)
+
+    def github_scores(self, developers: list[dict]) -> np.ndarray:
+        """Quantitative GitHub score (0-100) for each developer, relative to the set."""
+        with span("feature_engineering", developers=len(developers)):
+            features = CandidateStore.from_developers(developers).feature_matrix()
+            return score_features(features, self.normalization, self.weights, self.reference)
+
+    def build_developer(self, dev_data: dict, rating: dict, github_score: float) -> Developer:
+        dev = Developer(
+            username=dev_data.get("username"),
+            name=dev_data.get("name"),
+            bio=dev_data.get("bio"),
+            followers=dev_data.get("followers"),
+            following=dev_data.get("following"),
+            public_repos=dev_data.get("public_repos"),
+            repositories=dev_data.get("top_repositories", []),
+            cracked_score=rating.get("cracked_score", 0),
+            reasoning=rating.get("reasoning", ""),
+            github_score=github_score,
+        )
+        dev.ensemble_score = (GROK_WEIGHT * dev.cracked_score) + (GITHUB_WEIGHT * dev.github_score)
+        logger.debug(f"Scores for {dev.username}: Grok={dev.cracked_score}, GitHub={dev.github_score}, Ensemble={dev.ensemble_score}")
+        return dev
+
+    def score_and_sort(self, developers: list[dict], ratings: list[dict]) -> list[Developer]:
+        """Combines ratings with quantitative scores and sorts by ensemble score."""
+        github_scores = self.github_scores(developers)
+        with span("ensemble_scoring", developers=len(developers)):
+            rated_developers = [
+                self.build_developer(dev_data, rating, github_scores[i])
+                for i, (dev_data, rating) in enumerate(zip(developers, ratings))
+            ]
+
+            # Sort developers by the final ensemble score
+            rated_developers.sort(key=lambda dev: dev.ensemble_score, reverse=True)
         logger.info("Finished ranking developers by ensemble score.")
 
         return rated_developers
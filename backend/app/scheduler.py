@@ -0,0 +1,256 @@
+import os
+import time
+import random
+import asyncio
+import logging
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Optional, TypeVar
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Status codes worth retrying: rate limiting and transient upstream failures.
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+class TokenBucket:
+    """A token bucket that refills continuously up to `capacity` per minute."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.rate = float(per_minute) / 60.0
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` tokens are available (0 if available now)."""
+        self._refill()
+        # Requests larger than the bucket would never fit, so clamp them.
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float):
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+    def refund(self, amount: float):
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+class LLMScheduler:
+    """
+    Process-wide scheduler for outbound LLM calls.
+
+    Bounds in-flight requests, paces them with request/token buckets, retries
+    retryable failures with backoff (honoring Retry-After) and enforces a
+    per-request deadline that also bounds budget waits and retry delays.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = 8,
+        requests_per_minute: float = 480,
+        tokens_per_minute: float = 1_000_000,
+        max_retries: int = 4,
+        base_backoff: float = 0.5,
+        max_backoff: float = 20.0,
+        deadline: float = 60.0,
+    ):
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.deadline = deadline
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._request_bucket = TokenBucket(requests_per_minute)
+        self._token_bucket = TokenBucket(tokens_per_minute)
+        # Any 429 pauses every caller until this monotonic timestamp.
+        self._paused_until = 0.0
+
+        self.queued = 0
+        self.in_flight = 0
+        self.max_queue_depth = 0
+        self.completed = 0
+        self.failed = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.timed_out = 0
+
+    @classmethod
+    def from_env(cls) -> "LLMScheduler":
+        return cls(
+            max_in_flight=int(os.getenv("XAI_MAX_IN_FLIGHT", "8")),
+            requests_per_minute=float(os.getenv("XAI_REQUESTS_PER_MINUTE", "480")),
+            tokens_per_minute=float(os.getenv("XAI_TOKENS_PER_MINUTE", "1000000")),
+            max_retries=int(os.getenv("XAI_MAX_RETRIES", "4")),
+            deadline=float(os.getenv("XAI_REQUEST_DEADLINE", "60")),
+        )
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # asyncio primitives are bound to a loop, so rebuild it if the loop changes.
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def _acquire_budget(self, estimated_tokens: int, expires_at: float):
+        """Waits for request/token budget (and any 429 pause), but never past `expires_at`."""
+        while True:
+            # Checking and consuming happen with no await in between, so they're atomic on the loop.
+            wait = max(
+                self._paused_until - time.monotonic(),
+                self._request_bucket.wait_time(1),
+                self._token_bucket.wait_time(estimated_tokens),
+            )
+            if wait <= 0:
+                self._request_bucket.consume(1)
+                self._token_bucket.consume(estimated_tokens)
+                return
+            if time.monotonic() + wait > expires_at:
+                raise asyncio.TimeoutError("LLM request deadline reached while waiting for rate limit budget")
+            await asyncio.sleep(wait)
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: Optional[int]):
+        """Reconciles the token bucket once the provider reports real usage."""
+        if actual_tokens is None:
+            return
+        delta = actual_tokens - estimated_tokens
+        if delta > 0:
+            self._token_bucket.consume(delta)
+        elif delta < 0:
+            self._token_bucket.refund(-delta)
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        # The provider's Retry-After is used as given; only the request deadline caps it (see _run_with_retries).
+        retry_after = _retry_after_seconds(error)
+        if retry_after is not None:
+            return retry_after
+        delay = min(self.max_backoff, self.base_backoff * (2 ** attempt))
+        return delay * random.uniform(0.5, 1.0)
+
+    async def submit(
+        self,
+        call: Callable[[], Awaitable[T]],
+        estimated_tokens: int = 1000,
+        deadline: Optional[float] = None,
+    ) -> T:
+        """Runs `call` under the scheduler's concurrency, rate and retry policy."""
+        semaphore = self._get_semaphore()
+        deadline = deadline or self.deadline
+        started_at = time.monotonic()
+
+        self.queued += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queued)
+        acquired = False
+        try:
+            async with semaphore:
+                self.queued -= 1
+                acquired = True
+                self.in_flight += 1
+                try:
+                    return await self._run_with_retries(call, estimated_tokens, deadline, started_at)
+                finally:
+                    self.in_flight -= 1
+        except BaseException:
+            self.failed += 1
+            raise
+        finally:
+            # Cancelled (or failed) while still waiting for a slot.
+            if not acquired:
+                self.queued -= 1
+
+    async def _run_with_retries(self, call, estimated_tokens: int, deadline: float, started_at: float):
+        attempt = 0
+        expires_at = started_at + deadline
+        while True:
+            if time.monotonic() >= expires_at:
+                self.timed_out += 1
+                raise asyncio.TimeoutError(f"LLM request exceeded {deadline}s deadline")
+            try:
+                await self._acquire_budget(estimated_tokens, expires_at)
+            except asyncio.TimeoutError:
+                self.timed_out += 1
+                raise
+            try:
+                result = await asyncio.wait_for(call(), timeout=expires_at - time.monotonic())
+                self.completed += 1
+                return result
+            except asyncio.TimeoutError:
+                self.timed_out += 1
+                raise
+            except Exception as e:
+                if not _is_retryable(e) or attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt, e)
+                if _status_code(e) == 429:
+                    self.rate_limited += 1
+                    self._paused_until = max(self._paused_until, time.monotonic() + delay)
+                if time.monotonic() + delay >= expires_at:
+                    # Retrying any sooner would ignore Retry-After; waiting would overrun the deadline.
+                    self.timed_out += 1
+                    raise asyncio.TimeoutError(
+                        f"LLM request deadline of {deadline}s reached before it could be retried in {delay:.2f}s"
+                    ) from e
+                self.retries += 1
+                attempt += 1
+                logger.warning(f"LLM request failed ({e}); retry {attempt}/{self.max_retries} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+    def stats(self) -> dict:
+        return {
+            "queued": self.queued,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "max_queue_depth": self.max_queue_depth,
+            "completed": self.completed,
+            "failed": self.failed,
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+            "timed_out": self.timed_out,
+        }
+
+def _status_code(error: Exception) -> Optional[int]:
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code
+    return None
+
+def _is_retryable(error: Exception) -> bool:
+    status = _status_code(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES
+    return isinstance(error, httpx.TransportError)
+
+def _retry_after_seconds(error: Exception) -> Optional[float]:
+    if not isinstance(error, httpx.HTTPStatusError):
+        return None
+    value = error.response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+_scheduler: Optional[LLMScheduler] = None
+
+def get_llm_scheduler() -> LLMScheduler:
+    """Returns the process-wide LLM scheduler."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = LLMScheduler.from_env()
+    return _scheduler
@@ -0,0 +1,197 @@
+import os
+import time
+import asyncio
+import logging
+from collections import deque
+from contextlib import contextmanager
+from typing import Optional
+from datetime import datetime
+
+from prometheus_client import Counter, Gauge, Histogram, REGISTRY
+from prometheus_client.core import GaugeMetricFamily
+
+logger = logging.getLogger(__name__)
+
+# Stages: query_parse, github_search, rating, feature_engineering, ensemble_scoring,
+# serialization, plus search_pipeline (one shared run) and whole-request spans for the API handlers.
+STAGE_SECONDS = Histogram(
+    "crakd_stage_seconds",
+    "Time spent in each search pipeline stage.",
+    ["stage"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+STAGE_ERRORS = Counter("crakd_stage_errors_total", "Pipeline stages that raised.", ["stage"])
+
+LLM_TOKENS = Counter("crakd_llm_tokens_total", "LLM tokens reported by the provider.", ["direction"])
+RATING_FAILURES = Counter(
+    "crakd_rating_failures_total",
+    "Ratings that failed or were malformed, by kind (batch = whole completion failed, batch_item = re-rated individually).",
+    ["kind"],
+)
+RATING_ZERO_FALLBACKS = Counter(
+    "crakd_rating_zero_fallbacks_total",
+    "Developers that ended up with the cracked_score: 0 error fallback.",
+)
+
+CASCADE_CANDIDATES = Counter(
+    "crakd_cascade_candidates_total",
+    "Candidates seen by top-K cascade ranking, by outcome (cached, rated, pruned).",
+    ["outcome"],
+)
+CANDIDATE_SOURCES = Counter(
+    "crakd_candidates_total",
+    "Search candidates by where they came from (local index or GitHub).",
+    ["source"],
+)
+INDEX_REFRESHED = Counter(
+    "crakd_index_refreshed_total",
+    "Indexed profiles touched by the background refresher (refreshed or removed).",
+    ["outcome"],
+)
+SEARCH_REQUESTS = Counter(
+    "crakd_search_requests_total",
+    "Search requests by how they were served (started a run, joined one in flight, or cached).",
+    ["source"],
+)
+
+GITHUB_COST = Counter("crakd_github_graphql_cost_total", "GraphQL rate limit points spent.")
+GITHUB_REMAINING = Gauge("crakd_github_rate_limit_remaining", "GraphQL rate limit points remaining.")
+GITHUB_LIMIT = Gauge("crakd_github_rate_limit_limit", "GraphQL rate limit points per window.")
+GITHUB_RESET = Gauge("crakd_github_rate_limit_reset_timestamp_seconds", "When the GraphQL rate limit window resets.")
+GITHUB_POINTS_PER_SEARCH = Histogram(
+    "crakd_github_points_per_search",
+    "GraphQL rate limit points spent by one candidate search (search pages plus hydration).",
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+
+EVENT_LOOP_LAG = Histogram(
+    "crakd_event_loop_lag_seconds",
+    "How late the event loop woke a periodic probe (time it was blocked by synchronous work).",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+
+@contextmanager
+def span(stage: str, **fields):
+    """Times a pipeline stage into crakd_stage_seconds and logs a structured line."""
+    started_at = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STAGE_ERRORS.labels(stage).inc()
+        raise
+    finally:
+        elapsed = time.perf_counter() - started_at
+        STAGE_SECONDS.labels(stage).observe(elapsed)
+        details = " ".join(f"{k}={v}" for k, v in fields.items())
+        logger.debug(f"span stage={stage} seconds={elapsed:.4f} {details}".rstrip())
+
+def record_llm_usage(usage: dict):
+    if not usage:
+        return
+    LLM_TOKENS.labels("prompt").inc(usage.get("prompt_tokens") or 0)
+    LLM_TOKENS.labels("completion").inc(usage.get("completion_tokens") or 0)
+
+def record_github_rate_limit(rate_limit: dict):
+    if not rate_limit:
+        return
+    GITHUB_COST.inc(rate_limit.get("cost") or 0)
+    if rate_limit.get("remaining") is not None:
+        GITHUB_REMAINING.set(rate_limit["remaining"])
+    if rate_limit.get("limit") is not None:
+        GITHUB_LIMIT.set(rate_limit["limit"])
+    reset_at = rate_limit.get("resetAt")
+    if reset_at:
+        try:
+            GITHUB_RESET.set(datetime.fromisoformat(reset_at.replace("Z", "+00:00")).timestamp())
+        except ValueError:
+            pass
+    logger.info(f"GitHub API Rate Limit: {rate_limit}")
+
+class LoopLagMonitor:
+    """
+    Sleeps for a fixed interval in a loop and records how late each wake-up
+    was. Any lag is time the loop spent running something synchronous.
+    """
+
+    def __init__(self, interval: float, window: int = 600):
+        self.interval = interval
+        self.recent = deque(maxlen=window)
+        self.samples = 0
+        self.max_lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started_at = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - started_at - self.interval)
+            EVENT_LOOP_LAG.observe(lag)
+            self.recent.append(lag)
+            self.samples += 1
+            self.max_lag = max(self.max_lag, lag)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        recent = sorted(self.recent)
+        p99 = recent[min(len(recent) - 1, int(len(recent) * 0.99))] if recent else 0.0
+        return {
+            "interval_ms": self.interval * 1000,
+            "samples": self.samples,
+            "last_ms": self.recent[-1] * 1000 if self.recent else 0.0,
+            "recent_p99_ms": p99 * 1000,
+            "max_ms": self.max_lag * 1000,
+        }
+
+_loop_lag_monitor: Optional[LoopLagMonitor] = None
+
+def get_loop_lag_monitor() -> LoopLagMonitor:
+    global _loop_lag_monitor
+    if _loop_lag_monitor is None:
+        _loop_lag_monitor = LoopLagMonitor(float(os.getenv("CRAKD_LOOP_LAG_INTERVAL", "0.1")))
+    return _loop_lag_monitor
+
+class StatsCollector:
+    """Exposes the in-process stats() of the scheduler, caches and parser as gauges."""
+
+    def describe(self):
+        # Lets the registry learn the metric names without building the singletons at import.
+        yield GaugeMetricFamily("crakd_llm_scheduler", "LLM scheduler state and counters.", labels=["stat"])
+        yield GaugeMetricFamily("crakd_rating_cache", "Rating cache counters.", labels=["stat"])
+        yield GaugeMetricFamily("crakd_query_parses", "Query parses by source.", labels=["source"])
+
+    def collect(self):
+        # Imported lazily: those modules import this one.
+        from .scheduler import get_llm_scheduler
+        from .cache import get_rating_cache
+        from .query_parser import get_query_parser
+
+        scheduler = GaugeMetricFamily("crakd_llm_scheduler", "LLM scheduler state and counters.", labels=["stat"])
+        for name, value in get_llm_scheduler().stats().items():
+            scheduler.add_metric([name], value)
+        yield scheduler
+
+        cache = GaugeMetricFamily("crakd_rating_cache", "Rating cache counters.", labels=["stat"])
+        for name, value in get_rating_cache().stats().items():
+            cache.add_metric([name], value)
+        yield cache
+
+        parser_stats = get_query_parser().stats()
+        parses = GaugeMetricFamily("crakd_query_parses", "Query parses by source.", labels=["source"])
+        for source, count in parser_stats["counts"].items():
+            parses.add_metric([source], count)
+        yield parses
+
+REGISTRY.register(StatsCollector())
@@ -1,12 +1,14 @@
 import asyncio
-from .xai_client import XAIClient
+from .query_parser import get_query_parser
 
 async def parse_query_with_ai(query: str) -> dict:
     """
-    Uses Grok to parse the user's query into structured data.
+    Parses the user's query into structured data.
+
+    Common queries resolve locally or from cache; Grok is only asked when
+    the local parser can't account for every word.
     """
-    xai_client = XAIClient()
-    return await xai_client.parse_query(query)
+    return await get_query_parser().parse(query)
 
 def parse_query(query: str) -> dict:
     """
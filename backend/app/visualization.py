@@ -0,0 +1,175 @@
+import os
+import logging
+from typing import Optional
+
+import numpy as np
+
+from .feature_store import CHUNK_ROWS, FeatureStore
+
+logger = logging.getLogger(__name__)
+
+N_COMPONENTS = 2
+# Past these sizes the plot switches from labelled points to plain points, and from
+# points to a hexbin of (at most MAX_PLOT_POINTS evenly spaced) projected rows.
+ANNOTATE_MAX = 50
+SCATTER_MAX = 2000
+MAX_PLOT_POINTS = 20000
+
+# A full refit (scaler and components) happens once the store has grown this many
+# times over since the last one; in between, new rows only update the components.
+REFIT_GROWTH = 2
+
+class IncrementalProjection:
+    """
+    StandardScaler + IncrementalPCA fitted chunk by chunk over a FeatureStore
+    and persisted next to it, so every run projects onto the same axes.
+
+    A full fit makes one pass for the scaler and one for the components.
+    Later runs keep the scaler frozen and only partial_fit the components on
+    the rows added since, so every row the PCA saw was scaled the same way,
+    until the store has grown REFIT_GROWTH-fold and both are refitted.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._reset()
+
+    def _reset(self):
+        from sklearn.preprocessing import StandardScaler
+        from sklearn.decomposition import IncrementalPCA
+
+        self.scaler = StandardScaler()
+        self.pca = IncrementalPCA(n_components=N_COMPONENTS)
+        self.rows_fitted = 0
+        self.full_fit_rows = 0
+
+    @classmethod
+    def load(cls, path: str) -> "IncrementalProjection":
+        if os.path.exists(path):
+            import joblib
+            try:
+                return joblib.load(path)
+            except Exception as e:
+                logger.warning(f"Could not load the PCA model from {path} ({e}); refitting.")
+        return cls(path)
+
+    def save(self):
+        import joblib
+        tmp_path = self.path + ".tmp"
+        joblib.dump(self, tmp_path)
+        os.replace(tmp_path, self.path)
+
+    @property
+    def fitted(self) -> bool:
+        return self.rows_fitted > 0
+
+    def update(self, store) -> int:
+        """Fits the rows added to `store` since the last update; returns how many were fitted."""
+        stop = len(store)
+        if self.fitted and stop >= REFIT_GROWTH * self.full_fit_rows:
+            logger.info(f"Feature store grew from {self.full_fit_rows} to {stop} rows; refitting the PCA model.")
+            self._reset()
+        start = self.rows_fitted
+        # IncrementalPCA needs at least N_COMPONENTS rows per batch; a smaller tail waits for the next run.
+        tail = (stop - start) % CHUNK_ROWS
+        if 0 < tail < N_COMPONENTS:
+            stop -= tail
+        if stop <= start:
+            return 0
+        if not self.fitted:
+            for chunk in store.chunks(start, stop):
+                self.scaler.partial_fit(chunk)
+            self.full_fit_rows = stop
+        for chunk in store.chunks(start, stop):
+            self.pca.partial_fit(self.scaler.transform(chunk))
+        self.rows_fitted = stop
+        return stop - start
+
+    def transform(self, features: np.ndarray) -> np.ndarray:
+        return self.pca.transform(self.scaler.transform(features))
+
+    def transform_store(self, store, max_points: int = MAX_PLOT_POINTS) -> np.ndarray:
+        """Projects the store chunk by chunk, keeping every k-th row so at most max_points are held."""
+        step = max(1, -(-len(store) // max_points))
+        projected = [self.transform(chunk[::step]) for chunk in store.chunks() if len(chunk[::step])]
+        return np.concatenate(projected) if projected else np.empty((0, N_COMPONENTS))
+
+def _render(points: np.ndarray, developers: list[dict], background: Optional[np.ndarray],
+            explained_variance: np.ndarray, output_path: str):
+    # Imported here so the API (which never plots) doesn't pay for matplotlib.
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(12, 8))
+    if background is not None and len(background):
+        if len(background) > SCATTER_MAX:
+            plt.hexbin(background[:, 0], background[:, 1], gridsize=60, bins='log', cmap='Greys', mincnt=1)
+        else:
+            plt.scatter(background[:, 0], background[:, 1], s=8, color='lightgrey', label='Previous candidates')
+
+    if len(points) > SCATTER_MAX:
+        plt.hexbin(points[:, 0], points[:, 1], gridsize=60, bins='log', cmap='viridis', mincnt=1)
+        plt.colorbar(label='Candidates (log)')
+    else:
+        plt.scatter(points[:, 0], points[:, 1], alpha=0.7, label='This search')
+    # Labels only stay readable for a handful of points.
+    if len(points) <= ANNOTATE_MAX:
+        for i, dev in enumerate(developers):
+            plt.annotate(dev['username'], (points[i, 0], points[i, 1]), fontsize=9)
+
+    plt.title('PCA of Developer Profiles')
+    plt.xlabel(f'Principal Component 1 ({explained_variance[0]:.0%} of variance)')
+    plt.ylabel(f'Principal Component 2 ({explained_variance[1]:.0%} of variance)')
+    plt.grid(True)
+    if background is not None and len(background) and len(background) <= SCATTER_MAX and len(points) <= SCATTER_MAX:
+        plt.legend()
+    plt.savefig(output_path)
+    plt.close()
+    logger.info(f"PCA visualization saved to {output_path}")
+
+def perform_pca_and_visualize(features: np.ndarray, developers: list[dict], output_path: str = 'pca_analysis.png',
+                              store_path: Optional[str] = None):
+    """
+    Performs PCA and generates a visualization.
+
+    With a store_path, the features are added to the feature store there and
+    projected with the persisted incremental model (updated with the new rows),
+    so plots from different searches share axes and show earlier candidates
+    behind this search's. Without one, PCA is fitted on this run alone.
+    """
+    if not store_path:
+        if features.shape[0] < 2:
+            logger.warning("Not enough data points to perform PCA.")
+            return None
+        from sklearn.preprocessing import StandardScaler
+        from sklearn.decomposition import PCA
+
+        scaled_features = StandardScaler().fit_transform(features)
+        pca = PCA(n_components=N_COMPONENTS)
+        principal_components = pca.fit_transform(scaled_features)
+        logger.info(f"PCA completed. Explained variance ratio: {pca.explained_variance_ratio_}")
+        _render(principal_components, developers, None, pca.explained_variance_ratio_, output_path)
+        return principal_components
+
+    store = FeatureStore(store_path)
+    try:
+        model_path = os.path.join(store_path, "pca.joblib")
+        model = IncrementalProjection(model_path) if store.created else IncrementalProjection.load(model_path)
+        added = store.add(features, [dev['username'] for dev in developers])
+        fitted = model.update(store)
+        if not model.fitted:
+            logger.warning("Not enough data points to perform PCA.")
+            return None
+        if fitted:
+            model.save()
+        logger.info(
+            f"Incremental PCA: {added} new of {len(store)} stored candidates, {fitted} rows fitted. "
+            f"Explained variance ratio: {model.pca.explained_variance_ratio_}"
+        )
+
+        principal_components = model.transform(features)
+        background = model.transform_store(store)
+    finally:
+        store.close()
+    _render(principal_components, developers, background, model.pca.explained_variance_ratio_, output_path)
+    return principal_components
@@ -1,21 +1,145 @@
 import os
+import asyncio
+import logging
 import httpx
 import json
+from typing import Optional
 from dotenv import load_dotenv
+from .scheduler import get_llm_scheduler
+from .telemetry import span, record_llm_usage, RATING_FAILURES, RATING_ZERO_FALLBACKS
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# --- Shared HTTP client ---
+# One pooled client per process so every Grok call reuses warm keep-alive /
+# HTTP/2 connections instead of paying a fresh TCP+TLS handshake.
+_http_client: Optional[httpx.AsyncClient] = None
+_http_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+def _build_http_client() -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=int(os.getenv("XAI_MAX_CONNECTIONS", "20")),
+        max_keepalive_connections=int(os.getenv("XAI_MAX_KEEPALIVE_CONNECTIONS", "10")),
+        keepalive_expiry=float(os.getenv("XAI_KEEPALIVE_EXPIRY", "60")),
+    )
+    return httpx.AsyncClient(
+        http2=os.getenv("XAI_HTTP2", "1") != "0",
+        limits=limits,
+        timeout=httpx.Timeout(float(os.getenv("XAI_TIMEOUT", "30")), connect=10.0),
+    )
+
+def get_http_client() -> httpx.AsyncClient:
+    """Returns the process-wide HTTP client, creating it on first use."""
+    global _http_client, _http_client_loop
+    loop = asyncio.get_running_loop()
+    # Connections are bound to the loop that opened them, so a new loop
+    # (e.g. a second asyncio.run in the CLI) gets a fresh client.
+    if _http_client is None or _http_client.is_closed or _http_client_loop is not loop:
+        _http_client = _build_http_client()
+        _http_client_loop = loop
+    return _http_client
+
+async def start_http_client():
+    """Opens the shared HTTP client. Call once at application startup."""
+    get_http_client()
+    logger.info("Opened shared xAI HTTP client.")
+
+async def close_http_client():
+    """Closes the shared HTTP client. Call once at application shutdown."""
+    global _http_client, _http_client_loop
+    if _http_client is not None and not _http_client.is_closed:
+        await _http_client.aclose()
+        logger.info("Closed shared xAI HTTP client.")
+    _http_client = None
+    _http_client_loop = None
+
+# Profile fields worth sending to the model. Avatar/profile URLs and nulls
+# only burn tokens, so they are dropped from the serialized profile.
+PROFILE_FIELDS = ("username", "name", "bio", "followers", "following", "public_repos", "total_contributions")
+REPOSITORY_FIELDS = ("name", "stargazers_count", "forks_count", "description", "language")
+
+def compact_profile(developer_data: dict) -> dict:
+    """Returns a field-pruned copy of a developer profile for prompting."""
+    profile = {k: developer_data.get(k) for k in PROFILE_FIELDS if developer_data.get(k) not in (None, "")}
+    repos = []
+    for repo in developer_data.get("top_repositories") or []:
+        pruned = {k: repo.get(k) for k in REPOSITORY_FIELDS if repo.get(k) not in (None, "")}
+        if pruned:
+            repos.append(pruned)
+    if repos:
+        profile["repos"] = repos
+    return profile
+
+def dumps_compact(data) -> str:
+    """Serializes to JSON without insignificant whitespace."""
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+def _extract_json(response: str):
+    """Parses the JSON payload out of a model response, ignoring code fences."""
+    text = response.strip()
+    if text.startswith("```"):
+        text = text.strip("`")
+        if text.startswith("json"):
+            text = text[4:]
+    starts = [i for i in (text.find("{"), text.find("[")) if i != -1]
+    if starts:
+        text = text[min(starts):]
+    return json.loads(text.strip())
+
+def _valid_rating(rating) -> bool:
+    if not isinstance(rating, dict):
+        return False
+    score = rating.get("cracked_score")
+    if isinstance(score, bool) or not isinstance(score, (int, float)):
+        return False
+    return 0 <= score <= 100 and isinstance(rating.get("reasoning", ""), str)
+
+def rating_prompt(profile_json: str, query: str) -> str:
+    """Builds the prompt that rates a single serialized developer profile."""
+    return f"""As an expert AI talent scout for software engineers, your task is to evaluate a developer's profile based on the provided data. The user is searching for: "{query}".
+
+Analyze the following developer data:
+{profile_json}
+
+Based on the data, provide a "cracked_score" from 1 to 100, where 100 is a perfect match for a "cracked" developer according to the user's query. Also, provide a short "reasoning" for your score.
+
+A "cracked" developer is someone who is exceptionally skilled, innovative, and productive. Consider factors like code quality, project complexity, innovation, and community impact.
+
+Return ONLY a JSON object with two keys: "cracked_score" and "reasoning". No other text."""
+
+def batch_rating_prompt(profile_jsons: list[str], query: str) -> str:
+    """Builds the prompt that rates several serialized developer profiles at once."""
+    profiles = "\n".join(profile_jsons)
+    return f"""As an expert AI talent scout for software engineers, your task is to evaluate developer profiles based on the provided data. The user is searching for: "{query}".
+
+Analyze the following {len(profile_jsons)} developer profiles (one JSON object per line):
+{profiles}
+
+For EACH developer, provide a "cracked_score" from 1 to 100, where 100 is a perfect match for a "cracked" developer according to the user's query, and a short "reasoning" for the score. Score each developer independently.
+
+A "cracked" developer is someone who is exceptionally skilled, innovative, and productive. Consider factors like code quality, project complexity, innovation, and community impact.
+
+Return ONLY a JSON array with one object per developer, each with the keys "username", "cracked_score" and "reasoning". No other text."""
+
+RATING_ERROR = {"cracked_score": 0, "reasoning": "Error analyzing profile.", "error": True}
+
 class XAIClient:
-    def __init__(self):
+    def __init__(self, base_url: Optional[str] = None):
         self.api_key = os.getenv("XAI_API_KEY")
         if not self.api_key:
             raise ValueError("XAI_API_KEY environment variable not set")
-        self.base_url = "https://api.x.ai/v1"
+        self.base_url = base_url or os.getenv("XAI_BASE_URL", "https://api.x.ai/v1")
         self.model = "grok-4-1-fast-non-reasoning"
 
-    async def _chat_completion(self, prompt: str) -> str:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
+    async def _chat_completion(self, prompt: str, expected_output_tokens: int = 300) -> str:
+        scheduler = get_llm_scheduler()
+        # Rough estimate (~4 chars per token) used to pace against the TPM budget.
+        estimated_tokens = len(prompt) // 4 + expected_output_tokens
+
+        async def call():
+            response = await get_http_client().post(
                 f"{self.base_url}/chat/completions",
                 headers={
                     "Authorization": f"Bearer {self.api_key}",
@@ -26,30 +150,81 @@ class XAIClient:
                     "messages": [{"role": "user", "content": prompt}],
                     "temperature": 0.7
                 },
-                timeout=30.0
             )
             response.raise_for_status()
-            return response.json()["choices"][0]["message"]["content"]
+            return response.json()
+
+        data = await scheduler.submit(call, estimated_tokens=estimated_tokens)
+        usage = data.get("usage") or {}
+        scheduler.record_usage(estimated_tokens, usage.get("total_tokens"))
+        record_llm_usage(usage)
+        return data["choices"][0]["message"]["content"]
 
     async def rate_developer(self, developer_data: dict, query: str) -> dict:
-        prompt = f"""As an expert AI talent scout for software engineers, your task is to evaluate a developer's profile based on the provided data. The user is searching for: "{query}".
+        prompt = rating_prompt(dumps_compact(compact_profile(developer_data)), query)
 
-Analyze the following developer data:
-{json.dumps(developer_data, indent=2)}
+        try:
+            with span("rating", developers=1):
+                response = await self._chat_completion(prompt)
+            rating = _extract_json(response)
+            if not _valid_rating(rating):
+                raise ValueError(f"Malformed rating: {rating!r}")
+            return rating
+        except Exception as e:
+            print(f"Error generating rating for developer: {e}")
+            RATING_FAILURES.labels("single").inc()
+            RATING_ZERO_FALLBACKS.inc()
+            return dict(RATING_ERROR)
 
-Based on the data, provide a "cracked_score" from 1 to 100, where 100 is a perfect match for a "cracked" developer according to the user's query. Also, provide a short "reasoning" for your score.
+    async def rate_developers_batch(self, developers: list[dict], query: str) -> list[dict]:
+        """Rates several developers in a single completion.
 
-A "cracked" developer is someone who is exceptionally skilled, innovative, and productive. Consider factors like code quality, project complexity, innovation, and community impact.
+        Entries the model omits or returns malformed are re-rated one at a time.
+        If the completion itself fails or can't be parsed, the whole batch gets
+        the error rating instead: re-sending it as single calls would only
+        multiply the requests that are already being throttled.
+        """
+        if len(developers) == 1:
+            return [await self.rate_developer(developers[0], query)]
 
-Return ONLY a JSON object with two keys: "cracked_score" and "reasoning". No other text."""
+        prompt = batch_rating_prompt([dumps_compact(compact_profile(dev)) for dev in developers], query)
 
         try:
-            response = await self._chat_completion(prompt)
-            json_response_str = response.strip().replace('`', '').replace('json', '')
-            return json.loads(json_response_str)
+            with span("rating", developers=len(developers)):
+                response = await self._chat_completion(prompt, expected_output_tokens=80 * len(developers))
+            items = _extract_json(response)
+            if not isinstance(items, list):
+                raise ValueError("Expected a JSON array of ratings")
         except Exception as e:
-            print(f"Error generating rating for developer: {e}")
-            return {"cracked_score": 0, "reasoning": "Error analyzing profile."}
+            print(f"Error generating batch rating for {len(developers)} developers: {e}")
+            RATING_FAILURES.labels("batch").inc()
+            RATING_ZERO_FALLBACKS.inc(len(developers))
+            return [dict(RATING_ERROR) for _ in developers]
+
+        by_username = {}
+        for item in items:
+            if _valid_rating(item) and isinstance(item.get("username"), str):
+                by_username[item["username"].lower()] = {
+                    "cracked_score": item["cracked_score"],
+                    "reasoning": item.get("reasoning", ""),
+                }
+
+        ratings = [by_username.get((dev.get("username") or "").lower()) for dev in developers]
+        missing = [i for i, rating in enumerate(ratings) if rating is None]
+        if missing:
+            RATING_FAILURES.labels("batch_item").inc(len(missing))
+            logger.warning(f"Batch rating missing {len(missing)}/{len(developers)} developers; falling back to single ratings.")
+            fallback = await asyncio.gather(*(self.rate_developer(developers[i], query) for i in missing))
+            for i, rating in zip(missing, fallback):
+                ratings[i] = rating
+        return ratings
+
+    async def rate_developers(self, developers: list[dict], query: str, batch_size: int = 1) -> list[dict]:
+        """Rates developers concurrently in batches of `batch_size`, preserving order."""
+        batch_size = max(1, batch_size)
+        batches = [developers[i:i + batch_size] for i in range(0, len(developers), batch_size)]
+        results = await asyncio.gather(*(self.rate_developers_batch(batch, query) for batch in batches))
+        return [rating for batch in results for rating in batch]
 
     async def parse_query(self, query: str) -> dict:
         prompt = f"""You are an intelligent query parser for a developer search engine.
@@ -78,11 +253,19 @@ Return ONLY the JSON object. No other text."""
 
         try:
             response = await self._chat_completion(prompt)
-            json_response_str = response.strip().replace('`', '').replace('json', '')
-            parsed_query = json.loads(json_response_str)
+            parsed_query = _extract_json(response)
             if 'keywords' not in parsed_query or not isinstance(parsed_query['keywords'], list):
                 parsed_query['keywords'] = []
             return parsed_query
         except Exception as e:
             print(f"Error parsing query with AI: {e}")
-            return {"language": None, "role": None, "keywords": query.split()}
+            return {"language": None, "role": None, "keywords": query.split(), "error": True}
+
+_shared_client: Optional[XAIClient] = None
+
+def get_xai_client() -> XAIClient:
+    """Returns a process-wide XAIClient instance."""
+    global _shared_client
+    if _shared_client is None:
+        _shared_client = XAIClient()
+    return _shared_client
@@ -0,0 +1,103 @@
+"""
+Measures how many Grok ratings top-K cascade ranking saves, and how closely
+its top K agrees with the full pipeline, on a synthetic candidate set.
+
+Ratings come from a deterministic stand-in for Grok that favours profiles
+matching the query and with stronger GitHub stats, plus per-developer noise:
+
+    uv run python -m benchmarks.cascade --candidates 100 --top-k 5,10,25
+    uv run python -m benchmarks.cascade --ceilings 100,70,50 --noise 25
+"""
+import os
+import random
+import asyncio
+import argparse
+
+import numpy as np
+
+# DeveloperRanker only checks that the key is present.
+os.environ.setdefault("XAI_API_KEY", "benchmark")
+
+from app.cache import RatingCache
+from app.features import lexical_scores
+from app.github_client import parse_user_node
+from app.query_parser import query_terms
+from app.ranking import DeveloperRanker
+from benchmarks.fakes import synthetic_user
+
+QUERY = "find me a cracked rust compiler engineer"
+
+class SimulatedGrok:
+    def __init__(self, developers: list[dict], query: str, noise: float, seed: int):
+        lexical = lexical_scores(developers, query_terms(query))
+        followers = np.log1p([dev.get("followers") or 0 for dev in developers])
+        strength = followers / followers.max()
+        self.scores = {}
+        for dev, lex, s in zip(developers, lexical, strength):
+            rng = random.Random(f"{seed}:{dev['username']}")
+            score = 45 * lex + 35 * s + 10 + rng.gauss(0, noise)
+            self.scores[dev["username"]] = int(np.clip(round(score), 1, 100))
+        self.requests = 0
+
+    async def rate_developers_batch(self, developers: list[dict], query: str) -> list[dict]:
+        self.requests += 1
+        await asyncio.sleep(0)
+        return [{"cracked_score": self.scores[dev["username"]], "reasoning": "Simulated."} for dev in developers]
+
+def make_ranker(grok: SimulatedGrok, ceiling: float) -> DeveloperRanker:
+    ranker = DeveloperRanker()
+    ranker.rating_cache = RatingCache(None, 0, 0, 0)
+    ranker.xai_client = grok
+    ranker.mismatch_ceiling = ceiling
+    return ranker
+
+async def compare(developers: list[dict], top_k: int, ceiling: float, noise: float, seed: int) -> dict:
+    full_grok = SimulatedGrok(developers, QUERY, noise, seed)
+    full = await make_ranker(full_grok, 100).rank_developers(developers, QUERY)
+    expected = [dev.username for dev in full[:top_k]]
+
+    cascade_grok = SimulatedGrok(developers, QUERY, noise, seed)
+    ranker = make_ranker(cascade_grok, ceiling)
+    cascade = await ranker.rank_developers(developers, QUERY, top_k=top_k)
+    actual = [dev.username for dev in cascade]
+
+    stats = ranker.cascade_stats()
+    return {
+        "top_k": top_k,
+        "ceiling": ceiling,
+        "rated": stats["rated"],
+        "pruning_rate": stats["pruning_rate"],
+        "requests": cascade_grok.requests,
+        "full_requests": full_grok.requests,
+        "overlap": len(set(expected) & set(actual)) / top_k,
+        "same_order": expected == actual,
+    }
+
+async def run(args) -> list[dict]:
+    rng = random.Random(args.seed)
+    indices = rng.sample(range(args.corpus), args.candidates)
+    developers = [parse_user_node(synthetic_user(i)) for i in indices]
+    rows = []
+    for top_k in (int(k) for k in args.top_k.split(",")):
+        for ceiling in (float(c) for c in args.ceilings.split(",")):
+            rows.append(await compare(developers, top_k, ceiling, args.noise, args.seed))
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark top-K cascade ranking against the full pipeline")
+    parser.add_argument("--candidates", type=int, default=100)
+    parser.add_argument("--top-k", type=str, default="5,10,25", help="Comma-separated K values")
+    parser.add_argument("--ceilings", type=str, default="100,60",
+                        help="Comma-separated CRAKD_CASCADE_MISMATCH_CEILING values (100 = exact)")
+    parser.add_argument("--noise", type=float, default=15.0, help="Std-dev of the simulated rating noise")
+    parser.add_argument("--corpus", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'top_k':>6}{'ceiling':>9}{'rated':>7}{'pruned':>8}{'requests':>10}{'full req':>10}{'overlap':>9}{'same order':>12}")
+    for row in asyncio.run(run(args)):
+        print(f"{row['top_k']:>6}{row['ceiling']:>9.0f}{row['rated']:>7}{row['pruning_rate']:>8.0%}{row['requests']:>10}"
+              f"{row['full_requests']:>10}{row['overlap']:>9.0%}{str(row['same_order']):>12}")
+
+if __name__ == "__main__":
+    main()
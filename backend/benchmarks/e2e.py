@@ -0,0 +1,286 @@
+"""
+End-to-end benchmark of /search, /search-stream and the CLI against local
+fake GitHub and xAI servers (see benchmarks/fakes.py).
+
+Every scenario starts a fresh API process, so caches start cold unless
+--warm-cache is passed. Results are printed and saved as JSON under
+benchmarks/results/ for comparison across commits:
+
+    uv run python -m benchmarks.e2e --targets search,stream --concurrency 1,8 --limits 10,50
+    uv run python -m benchmarks.e2e --xai-latency-ms 800 --rate-429 0.05 --requests 40
+"""
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import subprocess
+from datetime import datetime, timezone
+from urllib.parse import quote
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(BACKEND_DIR, "benchmarks", "results")
+
+# Recognized by the local query parser, so parsing doesn't add LLM calls.
+LANGUAGES = ["rust", "python", "go", "typescript", "zig", "haskell", "java", "c++"]
+ROLES = ["engineer", "developer", "architect", "researcher"]
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def wait_for_port(port: int, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with socket.socket() as s:
+            if s.connect_ex(("127.0.0.1", port)) == 0:
+                return
+        time.sleep(0.05)
+    raise RuntimeError(f"Nothing listening on port {port} after {timeout}s")
+
+def start_process(args: list[str], env: dict, port: int) -> subprocess.Popen:
+    proc = subprocess.Popen(args, cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    wait_for_port(port)
+    return proc
+
+def stop_process(proc: subprocess.Popen):
+    proc.terminate()
+    try:
+        proc.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def query_for(i: int, distinct: bool) -> str:
+    if not distinct:
+        return f"cracked {LANGUAGES[0]} {ROLES[0]}"
+    return f"cracked {LANGUAGES[i % len(LANGUAGES)]} {ROLES[(i // len(LANGUAGES)) % len(ROLES)]}"
+
+class Harness:
+    def __init__(self, args):
+        self.args = args
+        self.github_port = free_port()
+        self.xai_port = free_port()
+        self.fakes = []
+
+    def app_env(self) -> dict:
+        env = dict(os.environ)
+        env.update({
+            "GITHUB_TOKEN": "benchmark",
+            "XAI_API_KEY": "benchmark",
+            "GITHUB_GRAPHQL_URL": f"http://127.0.0.1:{self.github_port}/graphql",
+            "XAI_BASE_URL": f"http://127.0.0.1:{self.xai_port}/v1",
+            "GITHUB_SCHEMA_PATH": "",
+            "XAI_HTTP2": "0",
+        })
+        if not self.args.warm_cache:
+            env.update({
+                "CRAKD_CACHE_PATH": "",
+                "CRAKD_RATING_CACHE_MEMORY_SIZE": "0",
+                "CRAKD_QUERY_CACHE_MEMORY_SIZE": "0",
+                # Concurrent identical requests are still coalesced; use --distinct-queries to avoid that.
+                "CRAKD_RESULT_CACHE_TTL": "0",
+                "CRAKD_INDEX_PATH": "",
+            })
+        return env
+
+    def start_fakes(self):
+        a = self.args
+        common = ["--rate-429", str(a.rate_429), "--seed", str(a.seed)]
+        self.fakes.append(start_process(
+            [sys.executable, "-m", "benchmarks.fakes", "github", "--port", str(self.github_port),
+             "--latency-ms", str(a.github_latency_ms), "--corpus", str(a.corpus)] + common,
+            dict(os.environ), self.github_port,
+        ))
+        self.fakes.append(start_process(
+            [sys.executable, "-m", "benchmarks.fakes", "xai", "--port", str(self.xai_port),
+             "--latency-ms", str(a.xai_latency_ms)] + common,
+            dict(os.environ), self.xai_port,
+        ))
+
+    def stop_fakes(self):
+        for proc in self.fakes:
+            stop_process(proc)
+
+    async def fake_stats(self, reset: bool = False) -> dict:
+        async with httpx.AsyncClient() as client:
+            stats = {}
+            for name, port in (("github", self.github_port), ("xai", self.xai_port)):
+                url = f"http://127.0.0.1:{port}/stats"
+                if reset:
+                    await client.post(f"{url}/reset")
+                else:
+                    stats[name] = (await client.get(url)).json()
+            return stats
+
+    async def drive_http(self, target: str, concurrency: int, limit: int) -> tuple[list[dict], float, dict]:
+        port = free_port()
+        api = start_process(
+            [sys.executable, "-m", "uvicorn", "app.api:app", "--port", str(port), "--log-level", "warning"],
+            self.app_env(), port,
+        )
+        samples = []
+        semaphore = asyncio.Semaphore(concurrency)
+        timeout = httpx.Timeout(self.args.timeout)
+        try:
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=timeout) as client:
+                async def one(i: int):
+                    query = quote(query_for(i, self.args.distinct_queries))
+                    async with semaphore:
+                        started = time.perf_counter()
+                        first_event = None
+                        ok = True
+                        try:
+                            if target == "search":
+                                response = await client.get(f"/search/{query}", params={"limit": limit})
+                                ok = response.status_code == 200
+                            else:
+                                async with client.stream("GET", f"/search-stream/{query}", params={"limit": limit}) as response:
+                                    async for line in response.aiter_lines():
+                                        if first_event is None and line.startswith("data: ") and '"result"' in line:
+                                            first_event = time.perf_counter() - started
+                                ok = response.status_code == 200
+                        except httpx.HTTPError:
+                            ok = False
+                        samples.append({
+                            "seconds": time.perf_counter() - started,
+                            "first_event_seconds": first_event,
+                            "ok": ok,
+                        })
+
+                # API process startup is excluded from the measured wall time.
+                started = time.perf_counter()
+                await asyncio.gather(*(one(i) for i in range(self.args.requests)))
+                wall = time.perf_counter() - started
+                event_loop = (await client.get("/stats")).json().get("event_loop", {})
+        finally:
+            stop_process(api)
+        return samples, wall, event_loop
+
+    async def drive_cli(self, concurrency: int, limit: int) -> tuple[list[dict], float]:
+        samples = []
+        semaphore = asyncio.Semaphore(concurrency)
+        env = self.app_env()
+
+        async def one(i: int):
+            async with semaphore:
+                started = time.perf_counter()
+                proc = await asyncio.create_subprocess_exec(
+                    sys.executable, "cli.py", query_for(i, self.args.distinct_queries),
+                    "--limit", str(limit), "--no-plot",
+                    cwd=BACKEND_DIR, env=env, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL,
+                )
+                await proc.wait()
+                samples.append({"seconds": time.perf_counter() - started, "first_event_seconds": None, "ok": proc.returncode == 0})
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(self.args.requests)))
+        return samples, time.perf_counter() - started
+
+    async def run_scenario(self, target: str, concurrency: int, limit: int) -> dict:
+        await self.fake_stats(reset=True)
+        event_loop = {}
+        if target == "cli":
+            samples, wall = await self.drive_cli(concurrency, limit)
+        else:
+            samples, wall, event_loop = await self.drive_http(target, concurrency, limit)
+        outbound = await self.fake_stats()
+
+        latencies = [s["seconds"] for s in samples if s["ok"]]
+        first_events = [s["first_event_seconds"] for s in samples if s["first_event_seconds"] is not None]
+        return {
+            "target": target,
+            "concurrency": concurrency,
+            "limit": limit,
+            "requests": len(samples),
+            "errors": sum(1 for s in samples if not s["ok"]),
+            "throughput_rps": len(latencies) / wall if wall else 0.0,
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "ttfe_p50": percentile(first_events, 50) if first_events else None,
+            "ttfe_p95": percentile(first_events, 95) if first_events else None,
+            "loop_lag_max_ms": event_loop.get("max_ms"),
+            "loop_lag_p99_ms": event_loop.get("recent_p99_ms"),
+            "outbound": outbound,
+        }
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def print_table(rows: list[dict]):
+    header = f"{'target':<8}{'conc':>5}{'limit':>6}{'ok':>5}{'err':>5}{'rps':>8}{'p50':>8}{'p95':>8}{'p99':>8}{'ttfe50':>8}{'gh req':>8}{'gh pts':>8}{'xai req':>8}{'429s':>6}{'lag max':>9}"
+    print(header)
+    for r in rows:
+        ttfe = f"{r['ttfe_p50']:.2f}" if r["ttfe_p50"] is not None else "-"
+        gh = r["outbound"].get("github", {})
+        xai = r["outbound"].get("xai", {})
+        throttled = gh.get("throttled", 0) + xai.get("throttled", 0)
+        lag = f"{r['loop_lag_max_ms']:.1f}" if r["loop_lag_max_ms"] is not None else "-"
+        print(f"{r['target']:<8}{r['concurrency']:>5}{r['limit']:>6}{r['requests'] - r['errors']:>5}{r['errors']:>5}"
+              f"{r['throughput_rps']:>8.2f}{r['p50']:>8.2f}{r['p95']:>8.2f}{r['p99']:>8.2f}{ttfe:>8}"
+              f"{gh.get('requests', 0):>8}{gh.get('points', 0):>8}{xai.get('requests', 0):>8}{throttled:>6}{lag:>9}")
+
+async def run(args) -> dict:
+    harness = Harness(args)
+    harness.start_fakes()
+    rows = []
+    try:
+        for target in args.targets.split(","):
+            for concurrency in (int(c) for c in args.concurrency.split(",")):
+                for limit in (int(value) for value in args.limits.split(",")):
+                    rows.append(await harness.run_scenario(target, concurrency, limit))
+    finally:
+        harness.stop_fakes()
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_revision": git_revision(),
+        "params": vars(args),
+        "scenarios": rows,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end benchmark against fake GitHub/xAI servers")
+    parser.add_argument("--targets", default="search,stream,cli", help="Comma-separated: search, stream, cli")
+    parser.add_argument("--concurrency", default="1,8", help="Comma-separated concurrency levels")
+    parser.add_argument("--limits", default="10,50", help="Comma-separated candidate limits")
+    parser.add_argument("--requests", type=int, default=16, help="Requests per scenario")
+    parser.add_argument("--distinct-queries", action="store_true", help="Vary the query per request instead of repeating one")
+    parser.add_argument("--warm-cache", action="store_true", help="Leave the rating/query caches enabled")
+    parser.add_argument("--github-latency-ms", type=float, default=150.0)
+    parser.add_argument("--xai-latency-ms", type=float, default=500.0)
+    parser.add_argument("--rate-429", type=float, default=0.0, help="Fraction of fake responses that are 429s")
+    parser.add_argument("--corpus", type=int, default=5000)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Results file (default benchmarks/results/e2e-<timestamp>.json)")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    print_table(report["scenarios"])
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"e2e-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Saved results to {output}")
+
+if __name__ == "__main__":
+    main()
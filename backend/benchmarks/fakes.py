@@ -0,0 +1,254 @@
+"""
+Local stand-ins for the GitHub GraphQL API and the xAI chat completions API.
+
+Both fakes add configurable latency/jitter, can inject 429s (with
+Retry-After) and count every request they receive. Run one per process:
+
+    uv run python -m benchmarks.fakes github --port 9101 --corpus 5000
+    uv run python -m benchmarks.fakes xai --port 9102 --latency-ms 400 --rate-429 0.05
+
+Point the app at them with GITHUB_GRAPHQL_URL=http://127.0.0.1:9101/graphql
+and XAI_BASE_URL=http://127.0.0.1:9102/v1. GET /stats returns the request
+counters and POST /stats/reset clears them.
+"""
+import re
+import json
+import random
+import asyncio
+import argparse
+import hashlib
+from collections import Counter
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+LANGUAGES = ["Rust", "Python", "Go", "TypeScript", "C++", "Zig", "Haskell", "Java"]
+WORDS = ["compiler", "runtime", "database", "kernel", "parser", "engine", "framework", "toolkit", "server", "agent"]
+
+class FakeConfig:
+    def __init__(self, latency_ms: float, jitter_ms: float, rate_429: float, retry_after: float, seed: int):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rate_429 = rate_429
+        self.retry_after = retry_after
+        self.rng = random.Random(seed)
+        self.counters = Counter()
+
+    async def delay(self):
+        latency = self.latency_ms + self.rng.uniform(-self.jitter_ms, self.jitter_ms)
+        if latency > 0:
+            await asyncio.sleep(latency / 1000)
+
+    def should_throttle(self) -> bool:
+        return self.rng.random() < self.rate_429
+
+def _add_common_routes(app: FastAPI, config: FakeConfig):
+    @app.get("/stats")
+    async def stats():
+        return dict(config.counters)
+
+    @app.post("/stats/reset")
+    async def reset():
+        config.counters.clear()
+        return {}
+
+    @app.middleware("http")
+    async def throttle_and_delay(request: Request, call_next):
+        if request.url.path.startswith("/stats"):
+            return await call_next(request)
+        config.counters["requests"] += 1
+        if config.should_throttle():
+            config.counters["throttled"] += 1
+            return JSONResponse(
+                {"message": "rate limited"}, status_code=429,
+                headers={"Retry-After": str(config.retry_after)},
+            )
+        await config.delay()
+        return await call_next(request)
+
+# --- GitHub GraphQL ---
+
+def synthetic_user(i: int) -> dict:
+    """Deterministic GraphQL User node for corpus index `i`."""
+    rng = random.Random(i)
+    language = LANGUAGES[i % len(LANGUAGES)]
+    repo_count = rng.randint(10, 200)
+    return {
+        "id": f"U_{i}",
+        "login": f"dev{i}",
+        "name": f"Developer {i}",
+        "bio": f"{language} engineer building {rng.choice(WORDS)}s.",
+        "avatarUrl": f"https://avatars.githubusercontent.com/u/{i}?v=4",
+        "url": f"https://github.com/dev{i}",
+        "followers": {"totalCount": int(rng.lognormvariate(6, 1.2)) + 100},
+        "following": {"totalCount": rng.randint(0, 500)},
+        "repositories": {
+            "totalCount": repo_count,
+            "nodes": [
+                {
+                    "name": f"{rng.choice(WORDS)}-{j}",
+                    "stargazerCount": int(rng.lognormvariate(4, 2)),
+                    "forkCount": int(rng.lognormvariate(2, 2)),
+                    "description": f"A {rng.choice(WORDS)} in {language}.",
+                    "primaryLanguage": {"name": language},
+                }
+                for j in range(5)
+            ],
+        },
+        "contributionsCollection": {"contributionCalendar": {"totalContributions": rng.randint(0, 5000)}},
+    }
+
+def create_github_app(config: FakeConfig, corpus: int) -> FastAPI:
+    app = FastAPI()
+    _add_common_routes(app, config)
+    remaining = {"points": 5000}
+
+    def rate_limit_block(cost: int) -> dict:
+        remaining["points"] = max(0, remaining["points"] - cost)
+        if remaining["points"] == 0:
+            remaining["points"] = 5000
+        return {"limit": 5000, "cost": cost, "remaining": remaining["points"], "resetAt": "2030-01-01T00:00:00Z"}
+
+    def search(variables: dict, full: bool) -> dict:
+        # Each search string maps to a stable slice of the corpus, restricted to users
+        # whose repositories are in the `language:` qualifier's language.
+        query_str = variables.get("query_str", "")
+        language = re.search(r"language:(\S+)", query_str)
+        names = [name.lower() for name in LANGUAGES]
+        if language and language.group(1).lower() in names:
+            first_index = names.index(language.group(1).lower())
+            step = len(LANGUAGES)
+        else:
+            first_index, step = 0, 1
+        matching = max(0, (corpus - first_index + step - 1) // step)
+        start = int(hashlib.sha256(query_str.encode()).hexdigest(), 16) % max(1, matching)
+        total = min(1000, matching)
+        offset = int(variables.get("cursor") or 0)
+        first = int(variables.get("limit") or 10)
+        indices = [first_index + step * ((start + k) % matching) for k in range(offset, min(offset + first, total))]
+        config.counters["search_nodes"] += len(indices)
+        end = offset + len(indices)
+        return {
+            "userCount": total,
+            "pageInfo": {"endCursor": str(end), "hasNextPage": end < total},
+            "nodes": [synthetic_user(i) if full else {"id": f"U_{i}", "login": f"dev{i}"} for i in indices],
+        }
+
+    def user_by_login(login: str):
+        match = re.fullmatch(r"dev(\d+)", login or "")
+        if not match or int(match.group(1)) >= corpus:
+            return None
+        return synthetic_user(int(match.group(1)))
+
+    def user_by_id(node_id: str):
+        match = re.fullmatch(r"U_(\d+)", node_id or "")
+        if not match or int(match.group(1)) >= corpus:
+            return None
+        return synthetic_user(int(match.group(1)))
+
+    def query_cost(data: dict, full: bool) -> int:
+        # GitHub's formula, roughly: one request per connection fetched, /100, at least 1.
+        # A full profile adds three (followers, following, repositories).
+        users = len(data.get("nodes") or []) + len((data.get("search") or {}).get("nodes") or [])
+        users += sum(1 for key, value in data.items() if re.fullmatch(r"u\d+", key) and value)
+        return max(1, round((1 + (3 * users if full else 0)) / 100))
+
+    @app.post("/graphql")
+    async def graphql(request: Request):
+        body = await request.json()
+        query = body.get("query", "")
+        variables = body.get("variables") or {}
+        data = {}
+        errors = []
+        # Searches that don't ask for the UserFields fragment get ids and logins only.
+        full = "UserFields" in query
+        if "search(" in query:
+            config.counters["search"] += 1
+            data["search"] = search(variables, full)
+        if "nodes(ids:" in query:
+            ids = variables.get("ids") or []
+            config.counters["node_lookups"] += len(ids)
+            data["nodes"] = [user_by_id(node_id) for node_id in ids]
+        # Aliased lookups: `u0: user(login: $login0) { ... }`
+        for alias, variable in re.findall(r"(\w+): user\(login: \$(\w+)\)", query):
+            config.counters["user_lookups"] += 1
+            data[alias] = user_by_login(variables.get(variable))
+            if data[alias] is None:
+                errors.append({"type": "NOT_FOUND", "path": [alias], "message": "Could not resolve to a User."})
+        cost = query_cost(data, full)
+        config.counters["points"] += cost
+        if "rateLimit" in query:
+            data["rateLimit"] = rate_limit_block(cost)
+        response = {"data": data, "errors": errors} if errors else {"data": data}
+        config.counters["response_bytes"] += len(json.dumps(response))
+        return response
+
+    return app
+
+# --- xAI chat completions ---
+
+def _profile_usernames(prompt: str) -> list[str]:
+    return re.findall(r'"username":"([^"]+)"', prompt)
+
+def _score(username: str) -> int:
+    return int(hashlib.sha256(username.encode()).hexdigest(), 16) % 100 + 1
+
+def create_xai_app(config: FakeConfig) -> FastAPI:
+    app = FastAPI()
+    _add_common_routes(app, config)
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        prompt = body["messages"][-1]["content"]
+        if "intelligent query parser" in prompt:
+            config.counters["parse"] += 1
+            content = {"language": "rust", "role": "engineer", "keywords": []}
+        elif "JSON array" in prompt:
+            usernames = _profile_usernames(prompt)
+            config.counters["batch_ratings"] += 1
+            config.counters["rated_developers"] += len(usernames)
+            content = [{"username": u, "cracked_score": _score(u), "reasoning": "Synthetic rating."} for u in usernames]
+        else:
+            usernames = _profile_usernames(prompt)
+            config.counters["single_ratings"] += 1
+            config.counters["rated_developers"] += 1
+            content = {"cracked_score": _score(usernames[0] if usernames else ""), "reasoning": "Synthetic rating."}
+        text = json.dumps(content)
+        prompt_tokens = len(prompt) // 4
+        completion_tokens = len(text) // 4
+        config.counters["prompt_tokens"] += prompt_tokens
+        config.counters["completion_tokens"] += completion_tokens
+        return {
+            "choices": [{"message": {"role": "assistant", "content": text}}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    return app
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run a fake GitHub GraphQL or xAI server")
+    parser.add_argument("service", choices=["github", "xai"])
+    parser.add_argument("--port", type=int, required=True)
+    parser.add_argument("--latency-ms", type=float, default=None, help="Mean added latency (default 150 github, 500 xai)")
+    parser.add_argument("--jitter-ms", type=float, default=None, help="Uniform +/- jitter (default 30%% of latency)")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--corpus", type=int, default=5000, help="Synthetic GitHub users to draw from")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    latency = args.latency_ms if args.latency_ms is not None else (150.0 if args.service == "github" else 500.0)
+    jitter = args.jitter_ms if args.jitter_ms is not None else latency * 0.3
+    config = FakeConfig(latency, jitter, args.rate_429, args.retry_after, args.seed)
+    app = create_github_app(config, args.corpus) if args.service == "github" else create_xai_app(config)
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
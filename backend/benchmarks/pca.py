@@ -0,0 +1,68 @@
+"""
+Times the CLI's PCA step as the accumulated candidate corpus grows.
+
+Each simulated run adds --per-run new candidates. "refit" fits PCA on every
+candidate seen so far, in memory, and plots them all (what comparable
+projections cost without the store). "incremental" adds the run's
+candidates to a feature store, fits only those rows and plots a bounded
+sample of the rest:
+
+    uv run python -m benchmarks.pca --runs 20 --per-run 1000
+"""
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+import numpy as np
+
+from app.visualization import perform_pca_and_visualize
+from benchmarks.scoring import synthetic_store
+
+def timed(fn, *args, **kwargs) -> float:
+    started_at = time.perf_counter()
+    fn(*args, **kwargs)
+    return time.perf_counter() - started_at
+
+def traced(fn, *args, **kwargs) -> float:
+    """Peak MiB allocated during the call (tracemalloc slows it down, so it isn't timed)."""
+    tracemalloc.start()
+    fn(*args, **kwargs)
+    peak = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    return peak
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark incremental PCA over an accumulating feature store")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--per-run", type=int, default=1000, help="New candidates per simulated run")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    seen = []
+    print(f"{'run':>4}{'corpus':>9}{'refit s':>10}{'refit MiB':>11}{'incr s':>9}{'incr MiB':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        # Warm-up, so sklearn and matplotlib imports aren't billed to the first run.
+        warm_up = synthetic_store(10, rng).feature_matrix()
+        perform_pca_and_visualize(warm_up, [{"username": f"warm{i}"} for i in range(10)], output_path=f"{tmp}/pca.png")
+        for run in range(args.runs):
+            store = synthetic_store(args.per_run, rng)
+            store.usernames = [f"dev{run}_{i}" for i in range(args.per_run)]
+            features = store.feature_matrix()
+            developers = [{"username": username} for username in store.usernames]
+            seen.append((features, developers))
+
+            corpus = np.concatenate([f for f, _ in seen])
+            everyone = [dev for _, devs in seen for dev in devs]
+            refit_s = timed(perform_pca_and_visualize, corpus, everyone, output_path=f"{tmp}/pca.png")
+            refit_mib = traced(perform_pca_and_visualize, corpus, everyone, output_path=f"{tmp}/pca.png")
+            # Two stores fed the same runs, one timed and one traced.
+            incr_s = timed(perform_pca_and_visualize, features, developers, output_path=f"{tmp}/pca.png",
+                           store_path=f"{tmp}/timed")
+            incr_mib = traced(perform_pca_and_visualize, features, developers, output_path=f"{tmp}/pca.png",
+                              store_path=f"{tmp}/traced")
+            print(f"{run + 1:>4}{len(corpus):>9}{refit_s:>10.3f}{refit_mib:>11.1f}{incr_s:>9.3f}{incr_mib:>10.1f}")
+
+if __name__ == "__main__":
+    main()
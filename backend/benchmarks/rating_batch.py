@@ -0,0 +1,119 @@
+"""
+Compares the legacy one-prompt-per-developer rating path against batched,
+compact-profile prompts.
+
+Offline (default) it reports prompt size and request counts per search:
+
+    uv run python -m benchmarks.rating_batch --developers 50
+
+With --live it also times real rating calls for each batch size (needs XAI_API_KEY).
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from app.xai_client import (
+    batch_rating_prompt,
+    compact_profile,
+    dumps_compact,
+    rating_prompt,
+    start_http_client,
+    close_http_client,
+    get_xai_client,
+)
+
+QUERY = "find me a cracked rust engineer"
+
+def synthetic_developer(i: int, rng: random.Random) -> dict:
+    """Builds a profile shaped like GitHubClient.find_cracked_developers output."""
+    return {
+        "username": f"dev{i}",
+        "name": rng.choice([f"Developer {i}", None]),
+        "bio": rng.choice(["Systems programmer. Rust, Zig and compilers.", None, ""]),
+        "avatar_url": f"https://avatars.githubusercontent.com/u/{100000 + i}?v=4",
+        "html_url": f"https://github.com/dev{i}",
+        "followers": rng.randint(100, 50000),
+        "following": rng.randint(0, 500),
+        "public_repos": rng.randint(10, 300),
+        "total_contributions": rng.randint(0, 5000),
+        "top_repositories": [
+            {
+                "name": f"project-{i}-{j}",
+                "stargazers_count": rng.randint(0, 20000),
+                "forks_count": rng.randint(0, 3000),
+                "description": rng.choice(["A fast async runtime.", None]),
+                "language": rng.choice(["Rust", "C++", None]),
+            }
+            for j in range(5)
+        ],
+    }
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // 4
+
+def offline_report(developers: list[dict], batch_sizes: list[int]) -> list[dict]:
+    rows = []
+    legacy_prompts = [rating_prompt(json.dumps(dev, indent=2), QUERY) for dev in developers]
+    rows.append({
+        "mode": "legacy (indent=2, full profile)",
+        "batch_size": 1,
+        "requests": len(legacy_prompts),
+        "prompt_tokens": sum(estimate_tokens(p) for p in legacy_prompts),
+    })
+    compact = [dumps_compact(compact_profile(dev)) for dev in developers]
+    for size in batch_sizes:
+        batches = [compact[i:i + size] for i in range(0, len(compact), size)]
+        prompts = [rating_prompt(b[0], QUERY) if len(b) == 1 else batch_rating_prompt(b, QUERY) for b in batches]
+        rows.append({
+            "mode": "compact",
+            "batch_size": size,
+            "requests": len(prompts),
+            "prompt_tokens": sum(estimate_tokens(p) for p in prompts),
+        })
+    return rows
+
+async def live_report(developers: list[dict], batch_sizes: list[int]) -> list[dict]:
+    rows = []
+    client = get_xai_client()
+    await start_http_client()
+    try:
+        for size in batch_sizes:
+            started = time.perf_counter()
+            ratings = await client.rate_developers(developers, QUERY, batch_size=size)
+            elapsed = time.perf_counter() - started
+            rows.append({
+                "batch_size": size,
+                "seconds": round(elapsed, 3),
+                "failed": sum(1 for r in ratings if r.get("error")),
+            })
+    finally:
+        await close_http_client()
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batched Grok rating prompts")
+    parser.add_argument("--developers", type=int, default=50, help="Number of synthetic developers per search")
+    parser.add_argument("--batch-sizes", type=str, default="1,5,10,25", help="Comma-separated batch sizes to compare")
+    parser.add_argument("--live", action="store_true", help="Also time real rating calls against the xAI API")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    developers = [synthetic_developer(i, rng) for i in range(args.developers)]
+    batch_sizes = [int(size) for size in args.batch_sizes.split(",")]
+
+    rows = offline_report(developers, batch_sizes)
+    baseline = rows[0]["prompt_tokens"]
+    print(f"{'mode':<34}{'batch':>6}{'requests':>10}{'prompt tokens':>15}{'vs legacy':>11}")
+    for row in rows:
+        print(f"{row['mode']:<34}{row['batch_size']:>6}{row['requests']:>10}{row['prompt_tokens']:>15}{row['prompt_tokens'] / baseline:>10.2f}x")
+
+    if args.live:
+        print()
+        for row in asyncio.run(live_report(developers, batch_sizes)):
+            print(f"batch_size={row['batch_size']:<4} {row['seconds']:>8.3f}s  failed={row['failed']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Times the columnar feature/scoring engine on large synthetic candidate sets.
+
+    uv run python -m benchmarks.scoring --candidates 100000
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from app.features import MAX_REPOS, NORMALIZATIONS, CandidateStore, ReferenceDistribution, score_features
+
+def synthetic_store(n: int, rng: np.random.Generator) -> CandidateStore:
+    repo_counts = rng.integers(0, MAX_REPOS + 1, size=n)
+    repo_mask = np.arange(MAX_REPOS)[None, :] < repo_counts[:, None]
+    return CandidateStore(
+        usernames=[f"dev{i}" for i in range(n)],
+        followers=rng.lognormal(6, 1.5, size=n).round(),
+        following=rng.integers(0, 500, size=n).astype(np.float64),
+        public_repos=rng.integers(10, 300, size=n).astype(np.float64),
+        contributions=rng.integers(0, 5000, size=n).astype(np.float64),
+        repo_stars=rng.lognormal(4, 2, size=(n, MAX_REPOS)).round() * repo_mask,
+        repo_forks=rng.lognormal(2, 2, size=(n, MAX_REPOS)).round() * repo_mask,
+        repo_mask=repo_mask,
+    )
+
+def synthetic_developers(n: int, rng: random.Random) -> list[dict]:
+    return [
+        {
+            "username": f"dev{i}",
+            "followers": rng.randint(100, 50000),
+            "following": rng.randint(0, 500),
+            "public_repos": rng.randint(10, 300),
+            "total_contributions": rng.randint(0, 5000),
+            "top_repositories": [
+                {"stargazers_count": rng.randint(0, 20000), "forks_count": rng.randint(0, 3000)}
+                for _ in range(rng.randint(0, MAX_REPOS))
+            ],
+        }
+        for i in range(n)
+    ]
+
+def legacy_features(developers: list[dict]) -> np.ndarray:
+    """The original per-developer loop, kept here for comparison."""
+    features = []
+    for dev in developers:
+        avg_stars = np.mean([repo['stargazers_count'] for repo in dev.get('top_repositories', [])]) if dev.get('top_repositories') else 0
+        avg_forks = np.mean([repo['forks_count'] for repo in dev.get('top_repositories', [])]) if dev.get('top_repositories') else 0
+        features.append([dev.get('followers', 0), dev.get('public_repos', 0), avg_stars, avg_forks])
+    return np.array(features)
+
+def timed(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark columnar feature engineering and scoring")
+    parser.add_argument("--candidates", type=int, default=100_000, help="Candidates in the synthetic store")
+    parser.add_argument("--dict-candidates", type=int, default=10_000, help="Candidate dicts for the ingestion comparison")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # Ingestion from candidate dicts: legacy loop vs columnar store.
+    developers = synthetic_developers(args.dict_candidates, random.Random(args.seed))
+    legacy = legacy_features(developers)
+    columnar = CandidateStore.from_developers(developers).feature_matrix()
+    assert np.allclose(legacy, columnar), "columnar features diverge from the legacy loop"
+    print(f"ingest {args.dict_candidates} dicts: legacy {timed(lambda: legacy_features(developers), 1):.1f} ms, "
+          f"columnar {timed(lambda: CandidateStore.from_developers(developers).feature_matrix(), 1):.1f} ms")
+
+    # Scoring an already-columnar store (e.g. cached profiles for offline re-ranking).
+    store = synthetic_store(args.candidates, np.random.default_rng(args.seed))
+    features = store.feature_matrix()
+    reference = ReferenceDistribution.fit(features)
+    print(f"feature_matrix over {args.candidates} candidates: {timed(store.feature_matrix):.2f} ms")
+    for method in NORMALIZATIONS:
+        batch_ms = timed(lambda: score_features(features, method))
+        ref_ms = timed(lambda: score_features(features, method, reference=reference))
+        print(f"score {method:<10} batch-relative {batch_ms:8.2f} ms   with reference {ref_ms:8.2f} ms")
+
+if __name__ == "__main__":
+    main()
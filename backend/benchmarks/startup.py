@@ -0,0 +1,71 @@
+"""
+Measures cold-start import time and resident memory of the API module.
+
+Each sample imports the module in a fresh interpreter, the way a new
+worker/container would:
+
+    uv run python -m benchmarks.startup --samples 5
+    uv run python -m benchmarks.startup --module cli --output startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Modules the API should never load at import time.
+HEAVY_MODULES = ("matplotlib", "matplotlib.pyplot", "sklearn", "scipy")
+
+PROBE = """
+import json, resource, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+# ru_maxrss is KiB on Linux and bytes on macOS.
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+rss_mb = rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+print(json.dumps({{
+    "seconds": elapsed,
+    "max_rss_mb": rss_mb,
+    "heavy_modules": [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+def sample(module: str) -> dict:
+    env = dict(os.environ)
+    # Module-level clients only check that credentials are present.
+    env.setdefault("GITHUB_TOKEN", "benchmark")
+    env.setdefault("XAI_API_KEY", "benchmark")
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        capture_output=True, text=True, check=True, env=env,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cold-start import time and RSS")
+    parser.add_argument("--module", default="app.api", help="Module to import (default app.api)")
+    parser.add_argument("--samples", type=int, default=5)
+    parser.add_argument("--output", help="Optional path to write the summary as JSON")
+    args = parser.parse_args()
+
+    samples = [sample(args.module) for _ in range(args.samples)]
+    summary = {
+        "module": args.module,
+        "samples": args.samples,
+        "import_seconds_median": statistics.median(s["seconds"] for s in samples),
+        "import_seconds_max": max(s["seconds"] for s in samples),
+        "max_rss_mb_median": statistics.median(s["max_rss_mb"] for s in samples),
+        "heavy_modules": sorted({m for s in samples for m in s["heavy_modules"]}),
+    }
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+    if args.module == "app.api" and summary["heavy_modules"]:
+        print(f"WARNING: app.api imported {summary['heavy_modules']} at startup", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
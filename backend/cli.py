@@ -1,9 +1,14 @@
+import os
+import sys
 import argparse
 import logging
 import asyncio
 from app.github_client import GitHubClient
 from app.ranking import DeveloperRanker
-from app.analysis import engineer_features, perform_pca_and_visualize
+from app.analysis import engineer_features
+from app.xai_client import start_http_client, close_http_client
+from app.batch import BatchRunner, read_queries
+from app.compute import run_in_process, shutdown_executors
 
 # --- Setup Logging ---
 log_format = '%(asctime)s - %(levelname)s - %(name)s - %(message)s'
@@ -15,29 +20,45 @@ logging.basicConfig(level=logging.INFO,
                     ])
 logger = logging.getLogger(__name__)
 
-async def main():
-    parser = argparse.ArgumentParser(description="CRAKD: AI That Identifies Cracked Talent")
-    parser.add_argument("query", type=str, nargs='?', default="find me a cracked rust engineer", help="The search query to find developers (e.g., 'cracked rust engineer')")
-    parser.add_argument("--limit", type=int, default=10, help="Number of developers to return")
-    args = parser.parse_args()
+async def run_batch(args, github_client: GitHubClient):
+    """Runs every query from --batch through one shared pipeline, writing JSONL."""
+    if args.batch == "-":
+        queries = read_queries(sys.stdin)
+    else:
+        with open(args.batch) as f:
+            queries = read_queries(f)
 
-    logger.info(f"Starting CRAKD analysis for query: '{args.query}' with limit: {args.limit}")
+    runner = BatchRunner(github_client, DeveloperRanker(), concurrency=args.concurrency, limit=args.limit)
+    await runner.run(queries, args.output, resume=not args.no_resume)
 
+async def run(args, github_client: GitHubClient):
+    """Runs a single search query through the full pipeline."""
     # 1. Find candidate developers
-    github_client = GitHubClient()
     developers_data = await github_client.find_cracked_developers(args.query, limit=args.limit)
 
     if not developers_data:
         logger.warning("No developers found matching the criteria.")
         return
 
-    # 2. Perform PCA and visualization
-    features = engineer_features(developers_data)
-    perform_pca_and_visualize(features, developers_data)
+    # 2. Perform PCA and visualization in a worker process while Grok rates the candidates
+    pca = None
+    if args.plot:
+        from app.visualization import perform_pca_and_visualize
+        features = engineer_features(developers_data)
+        store_path = os.getenv("CRAKD_PCA_STORE_PATH", "crakd_features")
+        pca = asyncio.ensure_future(run_in_process(perform_pca_and_visualize, features, developers_data, store_path=store_path))
 
     # 3. Rank developers using the ensemble model
-    ranker = DeveloperRanker()
-    ranked_developers = await ranker.rank_developers(developers_data, args.query)
+    try:
+        ranker = DeveloperRanker()
+        ranked_developers = await ranker.rank_developers(developers_data, args.query, top_k=args.top_k)
+    finally:
+        if pca is not None:
+            # The plot is a side product; its failure shouldn't lose (or mask) the ranking.
+            try:
+                await pca
+            except Exception as e:
+                logger.error(f"PCA analysis failed: {e}", exc_info=True)
 
     # 4. Display results
     logger.info("--- CRACKED DEVELOPER RANKING ---")
@@ -51,6 +72,35 @@ async def main():
         print(f"Reasoning: {dev.reasoning}")
     logger.info("--- END OF RANKING ---")
 
+async def main():
+    parser = argparse.ArgumentParser(description="CRAKD: AI That Identifies Cracked Talent")
+    parser.add_argument("query", type=str, nargs='?', default="find me a cracked rust engineer", help="The search query to find developers (e.g., 'cracked rust engineer')")
+    parser.add_argument("--limit", type=int, default=10, help="Number of developers to return")
+    parser.add_argument("--top-k", type=int, help="Only rank the best K; candidates that can't reach them are never sent to Grok")
+    parser.add_argument("--no-plot", dest="plot", action="store_false", help="Skip the PCA analysis and plot")
+    parser.add_argument("--batch", type=str, help="Run every query in this file (one per line, '-' for stdin) instead of a single query")
+    parser.add_argument("--output", type=str, default="batch_results.jsonl", help="JSONL file for batch results (also the resume checkpoint)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Queries run concurrently in batch mode")
+    parser.add_argument("--no-resume", action="store_true", help="Overwrite --output instead of skipping queries already in it")
+    args = parser.parse_args()
+
+    if args.batch:
+        logger.info(f"Starting CRAKD batch run from '{args.batch}' with limit: {args.limit}")
+    else:
+        logger.info(f"Starting CRAKD analysis for query: '{args.query}' with limit: {args.limit}")
+
+    github_client = GitHubClient()
+    await start_http_client()
+    try:
+        if args.batch:
+            await run_batch(args, github_client)
+        else:
+            await run(args, github_client)
+    finally:
+        await github_client.close()
+        await close_http_client()
+        shutdown_executors()
+
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -66,6 +66,14 @@ const LandingPage = () => {
 
               if (data.type === 'status') {
                 setStatusMessage(data.message);
+              } else if (data.type === 'result') {
+                // Insert each developer at its provisional rank as soon as it's rated
+                setApiResponse((prev) => {
+                  const next = [...(prev || [])];
+                  next.splice(data.rank, 0, data.developer);
+                  return next;
+                });
+                setStatusMessage(`rated ${data.rated}/${data.total} developers...`);
               } else if (data.type === 'done') {
                 setApiResponse(data.results);
                 setIsLoading(false);
@@ -3,7 +3,9 @@ import { motion, AnimatePresence } from 'framer-motion';
 import '../styles/Results.css';
 
 const Results = ({ results, loading, statusMessage }) => {
-  if (loading) {
+  const developerList = results || [];
+
+  if (loading && developerList.length === 0) {
     return (
       <div className="loading-message">
         <AnimatePresence mode="wait">
@@ -21,8 +23,6 @@ const Results = ({ results, loading, statusMessage }) => {
     );
   }
 
-  const developerList = results || [];
-
   return (
     <AnimatePresence>
       {developerList.length > 0 && (